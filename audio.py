@@ -0,0 +1,267 @@
+import math
+
+# Twilio media streams are 8 kHz mono mu-law, sent in 20 ms frames
+SAMPLE_RATE = 8000
+FRAME_MS = 20
+FRAME_BYTES = SAMPLE_RATE * FRAME_MS // 1000
+
+# mu-law byte that decodes to a zero sample
+MULAW_SILENCE = 0xFF
+
+_MULAW_BIAS = 0x84
+_MULAW_CLIP = 32635
+
+
+def linear_to_mulaw(sample):
+    """Encode a signed 16-bit PCM sample as a G.711 mu-law byte."""
+    sign = 0x80 if sample < 0 else 0
+    magnitude = min(abs(sample), _MULAW_CLIP) + _MULAW_BIAS
+    exponent = min(7, (magnitude >> 7).bit_length() - 1)
+    mantissa = (magnitude >> (exponent + 3)) & 0x0F
+    return ~(sign | (exponent << 4) | mantissa) & 0xFF
+
+
+def mulaw_to_linear(byte):
+    """Decode a G.711 mu-law byte to a signed 16-bit PCM sample."""
+    byte = ~byte & 0xFF
+    exponent = (byte >> 4) & 0x07
+    mantissa = byte & 0x0F
+    sample = (((mantissa << 3) + _MULAW_BIAS) << exponent) - _MULAW_BIAS
+    return -sample if byte & 0x80 else sample
+
+
+def silence(duration_ms):
+    """Return mu-law silence of the given duration."""
+    return bytes([MULAW_SILENCE]) * (SAMPLE_RATE * duration_ms // 1000)
+
+
+def hold_tone(period_ms=4000):
+    """Render a soft two-note chime followed by silence, for callers waiting in the queue."""
+    clip = bytearray()
+    for frequency in (523.25, 659.25):  # C5 then E5
+        note_samples = SAMPLE_RATE * 250 // 1000
+        for n in range(note_samples):
+            # Short linear fade in/out so the notes don't click
+            envelope = min(1.0, n / 200, (note_samples - n) / 200)
+            value = 3000 * envelope * math.sin(2 * math.pi * frequency * n / SAMPLE_RATE)
+            clip.append(linear_to_mulaw(int(value)))
+    clip.extend(silence(period_ms - 500))
+    return bytes(clip)
+
+
+# Squared sample value for every mu-law byte, so frame energy is a table lookup per byte
+_MULAW_SQUARED = [mulaw_to_linear(b) ** 2 for b in range(256)]
+
+
+def frame_rms(chunk):
+    """Root-mean-square level of a mu-law chunk, on the 16-bit PCM scale."""
+    if not chunk:
+        return 0.0
+    return math.sqrt(sum(map(_MULAW_SQUARED.__getitem__, chunk)) / len(chunk))
+
+
+class InboundChunker:
+    """Groups inbound Twilio frames into the chunks forwarded to the agent.
+
+    In fixed mode every chunk is ``chunk_ms`` long. In adaptive mode chunks stay
+    at ``chunk_ms`` while the caller is speaking (and for ``hangover_ms`` after,
+    so the silence that ends a turn reaches the agent promptly) and grow to
+    ``silence_chunk_ms`` during longer silences to cut the message rate.
+    """
+
+    def __init__(self, chunk_ms=FRAME_MS, adaptive=False, silence_chunk_ms=400,
+                 hangover_ms=1000, speech_threshold=500):
+        self.chunk_bytes = max(FRAME_BYTES, SAMPLE_RATE * chunk_ms // 1000)
+        self.silence_chunk_bytes = max(self.chunk_bytes, SAMPLE_RATE * silence_chunk_ms // 1000)
+        self.adaptive = adaptive
+        self.hangover_bytes = SAMPLE_RATE * hangover_ms // 1000
+        self.speech_threshold = speech_threshold
+        self.buffer = bytearray()
+        self.bytes_since_speech = self.hangover_bytes
+
+    def push(self, frame):
+        """Add caller audio, returning any chunks that are ready to send."""
+        self.buffer.extend(frame)
+        target = self.chunk_bytes
+        if self.adaptive:
+            if frame_rms(frame) >= self.speech_threshold:
+                self.bytes_since_speech = 0
+            else:
+                self.bytes_since_speech += len(frame)
+            if self.bytes_since_speech > self.hangover_bytes:
+                target = self.silence_chunk_bytes
+
+        if len(self.buffer) < target:
+            return []
+        if not self.adaptive:
+            chunks = []
+            while len(self.buffer) >= target:
+                chunks.append(bytes(self.buffer[:target]))
+                del self.buffer[:target]
+            return chunks
+        # Speech onset after a long silence sends everything buffered at once
+        chunk = bytes(self.buffer)
+        self.buffer.clear()
+        return [chunk]
+
+    def flush(self):
+        """Return whatever audio is still buffered."""
+        chunk = bytes(self.buffer)
+        self.buffer.clear()
+        return [chunk] if chunk else []
+
+
+class SilenceSuppressor:
+    """Holds back sustained caller silence instead of forwarding it to the agent.
+
+    Frames pass through while the caller speaks and for ``hangover_ms`` after, so
+    the agent still hears the pause that ends a turn. Past that, frames are
+    suppressed; the last ``preroll_ms`` of them are kept and sent ahead of the
+    first loud frame, so speech onsets are not clipped. ``keepalive_due()``
+    reports when another ``keepalive_ms`` of audio has been suppressed, so the
+    caller can keep the agent connection open.
+    """
+
+    def __init__(self, threshold=500, hangover_ms=1500, preroll_ms=200, keepalive_ms=5000):
+        self.threshold = threshold
+        self.hangover_bytes = SAMPLE_RATE * hangover_ms // 1000
+        self.preroll_bytes = SAMPLE_RATE * preroll_ms // 1000
+        self.keepalive_bytes = SAMPLE_RATE * keepalive_ms // 1000
+        self.preroll = bytearray()
+        self.bytes_since_speech = 0
+        self.bytes_since_keepalive = 0
+        self.bytes_suppressed = 0
+        self.keepalives = 0
+
+    @property
+    def suppressing(self):
+        return self.bytes_since_speech > self.hangover_bytes
+
+    def push(self, frame):
+        """Return the audio to forward for this frame (empty while suppressing)."""
+        if frame_rms(frame) >= self.threshold:
+            self.bytes_since_speech = 0
+        else:
+            self.bytes_since_speech += len(frame)
+
+        if not self.suppressing:
+            if self.preroll:
+                frame = bytes(self.preroll) + frame
+                self.preroll.clear()
+                self.bytes_since_keepalive = 0
+            return frame
+
+        self.preroll.extend(frame)
+        overflow = len(self.preroll) - self.preroll_bytes
+        if overflow > 0:
+            del self.preroll[:overflow]
+            self.bytes_suppressed += overflow
+            self.bytes_since_keepalive += overflow
+        return b""
+
+    def keepalive_due(self):
+        """True once for every keepalive interval of suppressed audio."""
+        if self.bytes_since_keepalive < self.keepalive_bytes:
+            return False
+        self.bytes_since_keepalive -= self.keepalive_bytes
+        self.keepalives += 1
+        return True
+
+    @property
+    def stats(self):
+        return {
+            "bytes_suppressed": self.bytes_suppressed,
+            "keepalives": self.keepalives
+        }
+
+
+class JitterBuffer:
+    """Puts inbound frames back in order by their Twilio chunk number.
+
+    A frame that arrives ahead of a missing one is held until ``window`` more
+    frames have arrived, so in-order audio passes straight through and
+    reordered audio is delayed by at most ``window`` frames. A frame still
+    missing after that is replaced with mu-law silence (gaps longer than
+    ``max_gap_frames`` are skipped rather than filled) and counted as lost. If
+    it shows up afterwards it is dropped and counted as late instead, so
+    ``lost`` only counts frames that never arrived. A frame seen twice is
+    counted as a duplicate.
+    """
+
+    # Gaps remembered for recognising late frames; arrivals from older gaps count as duplicates
+    MAX_TRACKED_GAPS = 32
+
+    def __init__(self, window=1, max_gap_frames=50):
+        self.window = window
+        self.max_gap_frames = max_gap_frames
+        self.next_number = None
+        self.pending = {}  # chunk number -> frame
+        self.missing = []  # ranges of chunk numbers given up on, oldest first
+        self.frame_bytes = FRAME_BYTES
+        self.late = 0
+        self.lost = 0
+        self.duplicates = 0
+
+    def push(self, number, frame):
+        """Add a frame, returning the frames now ready to forward, in order."""
+        if self.next_number is None:
+            self.next_number = number
+        if number < self.next_number:
+            if self._recover(number):
+                self.late += 1
+                self.lost -= 1
+            else:
+                self.duplicates += 1
+            return []
+        if number in self.pending:
+            self.duplicates += 1
+            return []
+        self.pending[number] = frame
+        self.frame_bytes = len(frame)
+        return self._release(force=False)
+
+    def flush(self):
+        """Release all held frames at the end of the stream, filling the gaps between them."""
+        return self._release(force=True)
+
+    def _release(self, force):
+        ready = []
+        while self.pending:
+            if self.next_number in self.pending:
+                ready.append(self.pending.pop(self.next_number))
+                self.next_number += 1
+                continue
+            if not force and max(self.pending) - self.next_number <= self.window:
+                break
+            gap = min(self.pending) - self.next_number
+            if gap > self.max_gap_frames:
+                # The stream jumped ahead; resume at the oldest frame we have
+                self._give_up(gap)
+            else:
+                ready.append(bytes([MULAW_SILENCE]) * self.frame_bytes)
+                self._give_up(1)
+        return ready
+
+    def _give_up(self, count):
+        """Count the next ``count`` frames as lost and move past them."""
+        start, stop = self.next_number, self.next_number + count
+        if self.missing and self.missing[-1].stop == start:
+            self.missing[-1] = range(self.missing[-1].start, stop)
+        else:
+            self.missing.append(range(start, stop))
+            del self.missing[:-self.MAX_TRACKED_GAPS]
+        self.lost += count
+        self.next_number = stop
+
+    def _recover(self, number):
+        """Remove a late frame from the gaps given up on; False if it wasn't missing."""
+        for position, gap in enumerate(self.missing):
+            if number in gap:
+                parts = [part for part in (range(gap.start, number), range(number + 1, gap.stop)) if part]
+                self.missing[position:position + 1] = parts
+                return True
+        return False
+
+    @property
+    def stats(self):
+        return {"late_frames": self.late, "lost_frames": self.lost, "duplicate_frames": self.duplicates}
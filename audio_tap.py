@@ -0,0 +1,154 @@
+"""Opt-in per-call audio capture for quality review.
+
+The relay only appends frames to an in-memory buffer; a background thread does
+all disk writes in large batches. Each call session gets its own file,
+<CallSid>-<start ms>.tap, so a reconnect of the same call never appends to an
+earlier session's file:
+
+    header:  b"PZTAP2", then <H sample rate> <d start epoch> <H sid length> <call sid>
+    records: <B track> <I ms since start> <I length> <mu-law bytes>
+
+PZTAP1 files (16-bit record lengths) can still be read.
+
+Both tracks are interleaved in arrival order. When the shared memory budget is
+used up, frames are dropped from the tap instead of ever blocking the call.
+"""
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+
+AUDIO_TAP_DIR = os.getenv("AUDIO_TAP_DIR")  # Unset disables the tap
+AUDIO_TAP_MAX_BUFFER_BYTES = int(os.getenv("AUDIO_TAP_MAX_BUFFER_BYTES", str(32 * 1024 * 1024)))
+AUDIO_TAP_FLUSH_BYTES = int(os.getenv("AUDIO_TAP_FLUSH_BYTES", str(256 * 1024)))
+
+TAP_MAGIC = b"PZTAP2"
+_TAP1_MAGIC = b"PZTAP1"
+TRACK_INBOUND = 0
+TRACK_OUTBOUND = 1
+
+_HEADER = struct.Struct("<HdH")
+_RECORD = struct.Struct("<BII")
+_TAP1_RECORD = struct.Struct("<BIH")
+
+# Bytes held by taps or waiting for the writer, across all calls
+_budget = {"buffered_bytes": 0}
+_budget_lock = threading.Lock()
+_write_queue = queue.Queue()
+_writer = None
+
+
+def _writer_loop():
+    """Write queued batches to their tap files, off the event loop."""
+    try:
+        os.makedirs(AUDIO_TAP_DIR, exist_ok=True)
+    except OSError as e:
+        print(f"Could not create audio tap directory {AUDIO_TAP_DIR}: {e}")
+    while True:
+        path, batch, first = _write_queue.get()
+        try:
+            # A session's first batch creates its file; never append to someone else's
+            with open(path, "xb" if first else "ab") as f:
+                f.write(batch)
+        except OSError as e:
+            print(f"Audio tap write failed for {path}: {e}")
+        finally:
+            with _budget_lock:
+                _budget["buffered_bytes"] -= len(batch)
+
+
+def _start_writer():
+    global _writer
+    if _writer is None:
+        _writer = threading.Thread(target=_writer_loop, name="audio-tap-writer", daemon=True)
+        _writer.start()
+
+
+class AudioTap:
+    """Buffers one call's inbound and outbound frames for the background writer."""
+
+    def __init__(self, call_sid, path):
+        self.path = path
+        self.created = False
+        self.started = time.monotonic()
+        self.buffer = bytearray(TAP_MAGIC)
+        sid = call_sid.encode()
+        self.buffer += _HEADER.pack(8000, time.time(), len(sid)) + sid
+        self.stats = {"frames_written": 0, "frames_dropped": 0}
+        with _budget_lock:
+            _budget["buffered_bytes"] += len(self.buffer)
+
+    def write(self, track, data):
+        """Copy a frame into the tap, dropping it if the memory budget is exhausted."""
+        size = _RECORD.size + len(data)
+        with _budget_lock:
+            if _budget["buffered_bytes"] + size > AUDIO_TAP_MAX_BUFFER_BYTES:
+                self.stats["frames_dropped"] += 1
+                return
+            _budget["buffered_bytes"] += size
+        offset_ms = int((time.monotonic() - self.started) * 1000)
+        self.buffer += _RECORD.pack(track, offset_ms, len(data))
+        self.buffer += data
+        self.stats["frames_written"] += 1
+        if len(self.buffer) >= AUDIO_TAP_FLUSH_BYTES:
+            self.flush()
+
+    def flush(self):
+        """Hand the buffered batch to the writer thread."""
+        if self.buffer:
+            _write_queue.put((self.path, bytes(self.buffer), not self.created))
+            self.created = True
+            self.buffer.clear()
+
+    def close(self):
+        self.flush()
+        print(f"Audio tap saved to {self.path}: {self.stats}")
+
+
+def open_tap(call_sid):
+    """Start a tap for the call, or return None when tapping is disabled."""
+    if not AUDIO_TAP_DIR:
+        return None
+    _start_writer()
+    return AudioTap(call_sid, os.path.join(AUDIO_TAP_DIR, f"{call_sid}-{int(time.time() * 1000)}.tap"))
+
+
+def read_tap(path):
+    """Read a tap file, returning (header dict, list of (track, ms since start, mu-law bytes))."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data.startswith(TAP_MAGIC):
+        record = _RECORD
+    elif data.startswith(_TAP1_MAGIC):
+        record = _TAP1_RECORD
+    else:
+        raise ValueError(f"{path} is not an audio tap file")
+    pos = len(TAP_MAGIC)
+    sample_rate, started, sid_length = _HEADER.unpack_from(data, pos)
+    pos += _HEADER.size
+    header = {
+        "sample_rate": sample_rate,
+        "started": started,
+        "call_sid": data[pos:pos + sid_length].decode()
+    }
+    pos += sid_length
+
+    frames = []
+    while pos + record.size <= len(data):
+        track, offset_ms, length = record.unpack_from(data, pos)
+        pos += record.size
+        frames.append((track, offset_ms, data[pos:pos + length]))
+        pos += length
+    return header, frames
+
+
+if __name__ == "__main__":
+    # Split a tap into raw mu-law tracks: python audio_tap.py CALL.tap
+    header, frames = read_tap(sys.argv[1])
+    base = os.path.splitext(sys.argv[1])[0]
+    for track, name in ((TRACK_INBOUND, "inbound"), (TRACK_OUTBOUND, "outbound")):
+        with open(f"{base}.{name}.ulaw", "wb") as f:
+            f.write(b"".join(frame for t, _, frame in frames if t == track))
+    print(f"Call {header['call_sid']}: {len(frames)} frames -> {base}.inbound.ulaw, {base}.outbound.ulaw")
@@ -0,0 +1,87 @@
+"""Compare inbound chunking settings against a local fake agent.
+
+Replays a synthetic caller (speech turns separated by pauses) through
+InboundChunker on a virtual 20 ms clock. The fake agent ends a turn once it
+has received ENDPOINT_MS of silence after speech, like Deepgram's endpointing.
+We report how long after that silence was spoken the agent actually got it
+(the buffering delay added to every turn) and the websocket message rate.
+
+Run from the repo root: python -m benchmarks.inbound_chunking
+"""
+import math
+import statistics
+
+from audio import FRAME_BYTES, FRAME_MS, InboundChunker, frame_rms, linear_to_mulaw, silence
+
+ENDPOINT_MS = 300
+SPEECH_THRESHOLD = 500
+
+# (speech ms, pause ms) per caller turn; the long pause is the caller reading a card number
+TURNS = [(1540, 2480), (2260, 3060), (940, 7980), (3020, 2540), (1180, 4120)] * 4
+
+
+def _speech_frame(n):
+    """A 20 ms voiced frame (300 Hz tone at conversational level)."""
+    return bytes(
+        linear_to_mulaw(int(8000 * math.sin(2 * math.pi * 300 * (n * FRAME_BYTES + i) / 8000)))
+        for i in range(FRAME_BYTES)
+    )
+
+
+def caller_frames():
+    """Yield (capture end time in ms, frame, is_speech) for the whole synthetic call."""
+    quiet = silence(FRAME_MS)
+    now = 0
+    for speech_ms, pause_ms in TURNS:
+        for n in range(speech_ms // FRAME_MS):
+            now += FRAME_MS
+            yield now, _speech_frame(n), True
+        for _ in range(pause_ms // FRAME_MS):
+            now += FRAME_MS
+            yield now, quiet, False
+
+
+def run(chunker):
+    """Stream the caller through a chunker; return (turn delays in ms, messages, duration ms)."""
+    delays = []
+    messages = 0
+    heard_speech = False
+    silence_heard_ms = 0
+    pending = []  # capture times of frames buffered in the chunker
+    now = 0
+
+    for now, frame, _ in caller_frames():
+        pending.append((now, frame))
+        for chunk in chunker.push(frame):
+            messages += 1
+            # The fake agent sees every frame in this chunk the moment it is sent
+            frames_in_chunk = len(chunk) // FRAME_BYTES
+            received, pending = pending[:frames_in_chunk], pending[frames_in_chunk:]
+            for captured_at, received_frame in received:
+                if frame_rms(received_frame) >= SPEECH_THRESHOLD:
+                    heard_speech = True
+                    silence_heard_ms = 0
+                    continue
+                silence_heard_ms += FRAME_MS
+                if heard_speech and silence_heard_ms >= ENDPOINT_MS:
+                    delays.append(now - captured_at)
+                    heard_speech = False
+    return delays, messages, now
+
+
+def main():
+    configs = [
+        ("fixed 400 ms (previous)", InboundChunker(chunk_ms=400)),
+        ("fixed 100 ms", InboundChunker(chunk_ms=100)),
+        ("fixed 20 ms", InboundChunker(chunk_ms=20)),
+        ("adaptive 20/400 ms", InboundChunker(chunk_ms=20, adaptive=True, silence_chunk_ms=400)),
+    ]
+    print(f"{'chunking':<26}{'turns':>6}{'mean delay':>12}{'max delay':>11}{'msgs/s':>9}")
+    for name, chunker in configs:
+        delays, messages, duration_ms = run(chunker)
+        print(f"{name:<26}{len(delays):>6}{statistics.mean(delays):>10.0f}ms{max(delays):>9.0f}ms"
+              f"{messages / (duration_ms / 1000):>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Memory cost of 100k orders: compact records vs the previous dict layout.
+
+Orders are built from JSON-decoded requests, as they arrive from the agent, so
+strings such as order type and size start out as separate objects per order.
+The dict layout mirrors what ORDERS_DB used to hold (fresh display names,
+timestamps and topping lists per item, float prices).
+
+Run from the repo root: python -m benchmarks.order_memory
+"""
+import datetime
+import json
+import tracemalloc
+
+import pizza_functions
+from order_records import Order
+
+ORDER_COUNT = 100_000
+
+REQUESTS = [
+    ("pickup", "", [
+        {"type": "pizza", "name": "pepperoni", "size": "large", "toppings": ["mushrooms"], "quantity": 1},
+        {"type": "drink", "name": "coke", "quantity": 1}
+    ]),
+    ("delivery", "123 Main St", [
+        {"type": "pizza", "name": "supreme", "size": "medium", "toppings": [], "quantity": 2},
+        {"type": "side", "name": "garlic_bread", "quantity": 1},
+        {"type": "drink", "name": "sprite", "quantity": 2}
+    ]),
+    ("pickup", "", [
+        {"type": "pizza", "name": "build_your_own", "size": "small", "toppings": ["ham", "pineapple", "feta"], "quantity": 1}
+    ]),
+]
+ENCODED_REQUESTS = [json.dumps(request) for request in REQUESTS]
+
+
+def _fresh(text):
+    """A new string object with the same value, as the old code produced per order."""
+    return (text + ".")[:-1]
+
+
+def build_records():
+    orders = {}
+    for order_id in range(1, ORDER_COUNT + 1):
+        order_type, address, items = json.loads(ENCODED_REQUESTS[order_id % len(REQUESTS)])
+        processed = [pizza_functions._process_order_item(item)["item"] for item in items]
+        orders[order_id] = Order(order_id, f"Customer {order_id}", f"555-{order_id:07d}", order_type,
+                                 address or None, processed, pizza_functions._estimated_time(order_type))
+    return orders
+
+
+def build_dicts(records):
+    """The previous ORDERS_DB layout, built from equivalent records."""
+    orders = {}
+    for order_id, record in records.items():
+        order = record.to_dict(pizza_functions.TOPPING_KEYS)
+        for item in order["items"]:
+            item["name"] = _fresh(item["name"])
+            if "size" in item:
+                item["size"] = _fresh(item["size"])
+        order["order_type"] = _fresh(order["order_type"])
+        order["timestamp"] = datetime.datetime.now().isoformat()
+        orders[order_id] = order
+    return orders
+
+
+def measure(build, *args):
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    orders = build(*args)
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return orders, used
+
+
+def main():
+    records, record_bytes = measure(build_records)
+    dicts, dict_bytes = measure(build_dicts, records)
+    print(f"{ORDER_COUNT:,} orders")
+    print(f"  dict layout (previous):  {dict_bytes / 2**20:7.1f} MiB  ({dict_bytes / ORDER_COUNT:5.0f} B/order)")
+    print(f"  slotted records:         {record_bytes / 2**20:7.1f} MiB  ({record_bytes / ORDER_COUNT:5.0f} B/order)")
+    print(f"  saving:                  {1 - record_bytes / dict_bytes:7.0%}")
+
+
+if __name__ == "__main__":
+    main()
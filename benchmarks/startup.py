@@ -0,0 +1,93 @@
+"""Measure cold-start cost of the voice server.
+
+1. `python -X importtime -c "import main"`: total import time and the slowest modules.
+2. Starts `python main.py` and times how long until port 5000 accepts TCP
+   connections (time to listening) and until a websocket handshake completes
+   (time to first accepted websocket).
+
+Run from the repo root: python -m benchmarks.startup
+"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import websockets
+
+PORT = 5000
+TIMEOUT_SECONDS = 30
+TOP_IMPORTS = 10
+
+
+def import_times():
+    """Return (total microseconds, [(cumulative us, module)]) for importing main."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        capture_output=True, text=True, check=True
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line.split(":", 1)[1].split("|")
+        modules.append((int(cumulative_us), name.strip()))
+    main_entry = next((us for us, name in modules if name == "main"), 0)
+    return main_entry, sorted(modules, reverse=True)
+
+
+def port_open():
+    with socket.socket() as sock:
+        sock.settimeout(0.05)
+        return sock.connect_ex(("localhost", PORT)) == 0
+
+
+async def first_websocket(started):
+    """Poll until the server completes a websocket handshake; return seconds since start."""
+    while time.perf_counter() - started < TIMEOUT_SECONDS:
+        try:
+            async with websockets.connect(f"ws://localhost:{PORT}", open_timeout=1):
+                return time.perf_counter() - started
+        except (OSError, websockets.exceptions.InvalidHandshake, asyncio.TimeoutError):
+            await asyncio.sleep(0.005)
+    return None
+
+
+def time_to_listening():
+    """Start the server and return (seconds to listening, seconds to first websocket)."""
+    env = dict(os.environ, DEEPGRAM_API_KEY=os.environ.get("DEEPGRAM_API_KEY", "benchmark"))
+    started = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "main.py"], env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        listening = None
+        while time.perf_counter() - started < TIMEOUT_SECONDS:
+            if port_open():
+                listening = time.perf_counter() - started
+                break
+            time.sleep(0.002)
+        accepted = asyncio.run(first_websocket(started)) if listening is not None else None
+        return listening, accepted
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    total_us, modules = import_times()
+    print(f"import main: {total_us / 1000:.1f} ms")
+    for cumulative_us, name in modules[:TOP_IMPORTS]:
+        print(f"  {cumulative_us / 1000:>8.1f} ms  {name}")
+
+    listening, accepted = time_to_listening()
+    if listening is None:
+        print(f"Server did not listen on port {PORT} within {TIMEOUT_SECONDS}s")
+        return
+    print(f"time to listening:            {listening * 1000:.0f} ms")
+    if accepted is not None:
+        print(f"time to first websocket:      {accepted * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
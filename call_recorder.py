@@ -0,0 +1,145 @@
+"""Record every websocket message of a call for deterministic replay.
+
+With CALL_RECORDING_DIR set, twilio_handler wraps the Twilio and Deepgram
+sockets in RecordingSocket. Each call session is written to its own file,
+<CallSid>-<start ms>.rec, which is created fresh and never appended to by
+another session:
+
+    header:  b"PZREC1"
+    records: <B channel> <B direction> <B kind> <d seconds since call start> <I length> <payload>
+
+Batches are appended from a worker thread so recording never does disk I/O on
+the event loop. replay_call.py drives the real handler from these files.
+"""
+import asyncio
+import os
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+CALL_RECORDING_DIR = os.getenv("CALL_RECORDING_DIR")  # Unset disables recording
+CALL_RECORDING_FLUSH_BYTES = 1024 * 1024
+
+RECORDING_MAGIC = b"PZREC1"
+
+CHANNEL_TWILIO = 0
+CHANNEL_DEEPGRAM = 1
+CHANNEL_NAMES = {CHANNEL_TWILIO: "twilio", CHANNEL_DEEPGRAM: "deepgram"}
+
+RECEIVED = 0  # Message arrived at our handler
+SENT = 1  # Message sent by our handler
+
+KIND_TEXT = 0
+KIND_BINARY = 1
+
+_RECORD = struct.Struct("<BBBdI")
+
+# One writer thread keeps each file's batches in order
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="call-recorder")
+
+
+def _append(path, batch, first):
+    with open(path, "xb" if first else "ab") as f:
+        f.write(batch)
+
+
+class RecordingSocket:
+    """Websocket proxy that logs every message passing through it."""
+
+    def __init__(self, ws, recorder, channel):
+        self.ws = ws
+        self.recorder = recorder
+        self.channel = channel
+
+    async def send(self, message):
+        self.recorder.record(self.channel, SENT, message)
+        await self.ws.send(message)
+
+    async def recv(self):
+        message = await self.ws.recv()
+        self.recorder.record(self.channel, RECEIVED, message)
+        return message
+
+    async def _iterate(self):
+        async for message in self.ws:
+            self.recorder.record(self.channel, RECEIVED, message)
+            yield message
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def close(self):
+        await self.ws.close()
+
+    def __getattr__(self, name):
+        return getattr(self.ws, name)
+
+
+class CallRecorder:
+    """Collects one call's messages and appends them to its .rec file in batches."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.started_ms = int(time.time() * 1000)
+        self.call_sid = None
+        self.path = None
+        self.buffer = bytearray(RECORDING_MAGIC)
+        self.message_count = 0
+
+    def wrap(self, ws, channel):
+        return RecordingSocket(ws, self, channel)
+
+    def record(self, channel, direction, message):
+        if isinstance(message, str):
+            kind, payload = KIND_TEXT, message.encode()
+        else:
+            kind, payload = KIND_BINARY, bytes(message)
+        elapsed = time.monotonic() - self.started
+        self.buffer += _RECORD.pack(channel, direction, kind, elapsed, len(payload))
+        self.buffer += payload
+        self.message_count += 1
+        if len(self.buffer) >= CALL_RECORDING_FLUSH_BYTES:
+            self.flush()
+
+    def flush(self):
+        """Append the buffered batch to disk from a worker thread."""
+        if not self.buffer:
+            return None
+        first = self.path is None
+        if first:
+            self.path = os.path.join(CALL_RECORDING_DIR, f"{self.call_sid or 'unknown'}-{self.started_ms}.rec")
+        batch = bytes(self.buffer)
+        self.buffer.clear()
+        return asyncio.get_running_loop().run_in_executor(_writer, _append, self.path, batch, first)
+
+    async def close(self):
+        pending = self.flush()
+        if pending:
+            await pending
+        print(f"Call recording saved to {self.path}: {self.message_count} messages")
+
+
+def open_recorder():
+    """Start recording a call, or return None when recording is disabled."""
+    if not CALL_RECORDING_DIR:
+        return None
+    os.makedirs(CALL_RECORDING_DIR, exist_ok=True)
+    return CallRecorder()
+
+
+def read_recording(path):
+    """Read a .rec file into a list of (channel, direction, kind, seconds, payload)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(RECORDING_MAGIC):
+        raise ValueError(f"{path} is not a call recording")
+    pos = len(RECORDING_MAGIC)
+    records = []
+    while pos + _RECORD.size <= len(data):
+        channel, direction, kind, elapsed, length = _RECORD.unpack_from(data, pos)
+        pos += _RECORD.size
+        payload = data[pos:pos + length]
+        pos += length
+        message = payload.decode() if kind == KIND_TEXT else payload
+        records.append((channel, direction, kind, elapsed, message))
+    return records
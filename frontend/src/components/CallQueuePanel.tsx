@@ -5,6 +5,7 @@ import { Phone, Users } from 'lucide-react'
 interface CallQueue {
   active_calls: number
   customers_waiting: number
+  estimated_wait_seconds?: number
 }
 
 interface CallQueuePanelProps {
@@ -48,6 +49,11 @@ export default function CallQueuePanel({ callQueue }: CallQueuePanelProps) {
                 <div className="font-pixel text-2xl">
                   {callQueue.customers_waiting.toString().padStart(2, '0')}
                 </div>
+                {callQueue.customers_waiting > 0 && (
+                  <div className="font-pixel text-xs">
+                    ~{Math.ceil((callQueue.estimated_wait_seconds || 0) / 60)}m wait
+                  </div>
+                )}
               </div>
             </div>
             {callQueue.customers_waiting > 0 && (
@@ -1,6 +1,6 @@
 'use client'
 
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import Header from './Header'
 import CallQueuePanel from './CallQueuePanel'
 import ActiveOrdersPanel from './ActiveOrdersPanel'
@@ -22,6 +22,7 @@ interface Order {
 interface CallQueue {
   active_calls: number
   customers_waiting: number
+  estimated_wait_seconds?: number
 }
 
 interface DashboardData {
@@ -30,10 +31,31 @@ interface DashboardData {
   total_orders_today: number
 }
 
+interface BulkStatusResult {
+  order_id: number
+  success?: boolean
+  error?: string
+}
+
+// Completions clicked within this window are sent as one bulk update
+const COMPLETE_BATCH_DELAY_MS = 300
+
 export default function Dashboard() {
   const [dashboardData, setDashboardData] = useState<DashboardData | null>(null)
   const [isLoading, setIsLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
+  const [completionError, setCompletionError] = useState<string | null>(null)
+  // Tickets marked complete but not yet confirmed by the server stay hidden, even across polls
+  const pendingCompletions = useRef<Set<number>>(new Set())
+  const sendingCompletions = useRef<Set<number>>(new Set())
+  const completionTimer = useRef<ReturnType<typeof setTimeout> | null>(null)
+
+  const withoutCompleting = (data: DashboardData): DashboardData => ({
+    ...data,
+    active_orders: data.active_orders.filter(order =>
+      !pendingCompletions.current.has(order.id) && !sendingCompletions.current.has(order.id)
+    )
+  })
 
   const fetchDashboardData = async () => {
     try {
@@ -41,8 +63,8 @@ export default function Dashboard() {
       if (!response.ok) {
         throw new Error('Failed to fetch dashboard data')
       }
-      const data = await response.json()
-      setDashboardData(data)
+      const data: DashboardData = await response.json()
+      setDashboardData(withoutCompleting(data))
       setError(null)
     } catch (err) {
       setError('Failed to connect to server')
@@ -52,21 +74,54 @@ export default function Dashboard() {
     }
   }
 
-  const markOrderComplete = async (orderId: number) => {
+  const flushCompletions = async () => {
+    completionTimer.current = null
+    const orderIds = Array.from(pendingCompletions.current)
+    pendingCompletions.current.clear()
+    if (orderIds.length === 0) return
+    orderIds.forEach(orderId => sendingCompletions.current.add(orderId))
+
+    let failedIds = orderIds
     try {
-      const response = await fetch(`http://localhost:8000/api/orders/${orderId}/complete`, {
+      const response = await fetch('http://localhost:8000/api/orders/bulk-status', {
         method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ order_ids: orderIds, kitchen_status: 'completed' }),
       })
       
       if (!response.ok) {
-        throw new Error('Failed to mark order as complete')
+        throw new Error('Failed to mark orders as complete')
       }
       
-      // Refresh dashboard data
-      await fetchDashboardData()
+      // The endpoint answers 200 even when some updates fail; check each one
+      const result: { results: BulkStatusResult[] } = await response.json()
+      const failed = result.results.filter(entry => !entry.success)
+      failed.forEach(entry => console.error(`Error marking order #${entry.order_id} complete:`, entry.error))
+      failedIds = failed.map(entry => entry.order_id)
     } catch (err) {
-      console.error('Error marking order complete:', err)
-      setError('Failed to update order status')
+      console.error('Error marking orders complete:', err)
+    } finally {
+      // Failed tickets come back on the refresh below
+      orderIds.forEach(orderId => sendingCompletions.current.delete(orderId))
+    }
+
+    setCompletionError(failedIds.length > 0
+      ? `Could not complete order${failedIds.length > 1 ? 's' : ''} ${failedIds.map(id => `#${id}`).join(', ')}`
+      : null)
+    // Refresh dashboard data once for the whole batch
+    await fetchDashboardData()
+  }
+
+  const markOrderComplete = (orderId: number) => {
+    // Hide the ticket right away; the server update goes out with the rest of the batch
+    pendingCompletions.current.add(orderId)
+    setDashboardData(data => data && {
+      ...data,
+      active_orders: data.active_orders.filter(order => order.id !== orderId)
+    })
+
+    if (completionTimer.current === null) {
+      completionTimer.current = setTimeout(flushCompletions, COMPLETE_BATCH_DELAY_MS)
     }
   }
 
@@ -111,6 +166,12 @@ export default function Dashboard() {
       />
       
       <main className="container mx-auto px-6 py-8">
+        {completionError && (
+          <div className="pixel-card mb-8 text-center">
+            <p className="retro-subtitle text-destructive">{completionError}</p>
+          </div>
+        )}
+
         <div className="grid grid-cols-1 lg:grid-cols-3 gap-8">
           {/* Call Queue Panel - takes 1 column */}
           <div className="lg:col-span-1">
@@ -0,0 +1,99 @@
+"""Pre-rendered greeting audio, played while the agent session connects.
+
+The greeting in config.json is synthesized once per greeting text and speak
+model with Deepgram's speak REST API, as raw 8 kHz mu-law, and saved to
+GREETING_CACHE_DIR as <sha1>.ulaw. The clip is loaded at startup in a
+background thread (rendering it first if it isn't cached yet). Once it is in
+memory, calls get the clip as soon as they are admitted and the agent's own
+greeting is left out of Settings.
+"""
+import hashlib
+import json
+import os
+import threading
+
+GREETING_CACHE_DIR = os.getenv("GREETING_CACHE_DIR", "greeting_cache")
+GREETING_CACHE_ENABLED = os.getenv("GREETING_CACHE", "true").lower() == "true"
+SPEAK_URL = "https://api.deepgram.com/v1/speak"
+
+_clip = None  # Greeting audio, once loaded
+
+
+def greeting_settings(config):
+    """Return (greeting text, speak model) from the agent Settings."""
+    agent = config["agent"]
+    return agent.get("greeting"), agent["speak"]["provider"].get("model")
+
+
+def cache_path(text, model):
+    key = hashlib.sha1(f"{model}\n{text}".encode()).hexdigest()
+    return os.path.join(GREETING_CACHE_DIR, f"{key}.ulaw")
+
+
+def render_greeting(text, model, api_key):
+    """Synthesize the greeting as raw 8 kHz mu-law with the speak REST API."""
+    # Imported here: only needed the first time a greeting is rendered
+    import urllib.parse
+    import urllib.request
+
+    query = urllib.parse.urlencode({"model": model, "encoding": "mulaw", "sample_rate": 8000, "container": "none"})
+    request = urllib.request.Request(
+        f"{SPEAK_URL}?{query}",
+        data=json.dumps({"text": text}).encode(),
+        headers={"Authorization": f"Token {api_key}", "Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return response.read()
+
+
+def load_greeting(config, api_key):
+    """Load the clip for the configured greeting, rendering and caching it if needed."""
+    global _clip
+    text, model = greeting_settings(config)
+    if not text:
+        return
+    path = cache_path(text, model)
+    try:
+        with open(path, "rb") as f:
+            _clip = f.read() or None
+        return
+    except FileNotFoundError:
+        pass
+
+    if not api_key:
+        print("No DEEPGRAM_API_KEY to render the greeting. The agent will greet callers itself.")
+        return
+    try:
+        clip = render_greeting(text, model, api_key)
+    except Exception as e:
+        print(f"Could not render greeting audio: {e}. The agent will greet callers itself.")
+        return
+    os.makedirs(GREETING_CACHE_DIR, exist_ok=True)
+    with open(path + ".tmp", "wb") as f:
+        f.write(clip)
+    os.replace(path + ".tmp", path)
+    _clip = clip or None
+    print(f"Rendered greeting audio to {path} ({len(clip)} bytes)")
+
+
+def start_loading(config, api_key):
+    """Load the greeting clip in the background so startup isn't held up."""
+    if GREETING_CACHE_ENABLED:
+        threading.Thread(target=load_greeting, args=(config, api_key), daemon=True).start()
+
+
+def greeting_clip():
+    """The greeting audio, or None while it isn't loaded (the agent greets instead)."""
+    return _clip
+
+
+def without_greeting(config):
+    """Settings for a call that already heard the cached greeting."""
+    text, _ = greeting_settings(config)
+    agent = dict(config["agent"])
+    agent.pop("greeting", None)
+    think = dict(agent["think"])
+    think["prompt"] = (f"The caller has already been greeted with: \"{text}\" Do not greet them again; "
+                       f"wait for them to speak and continue from there.\n\n{think['prompt']}")
+    agent["think"] = think
+    return dict(config, agent=agent)
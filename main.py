@@ -1,28 +1,85 @@
 import asyncio
 import base64
+import hashlib
+import heapq
 import json
+import time
 import websockets
 import os
+from collections import OrderedDict, deque
 from dotenv import load_dotenv
-from twilio.rest import Client
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 import threading
 
 load_dotenv()
 
-from pizza_functions import FUNCTION_MAP
-
-# Conversation state tracking
-conversation_state = {
-    "order_placed": False,
-    "call_should_end": False,
-    "grace_period_start": None
+from pizza_functions import FUNCTION_MAP, archive_completed_orders
+from audio import SAMPLE_RATE, FRAME_BYTES, FRAME_MS, MULAW_SILENCE, InboundChunker, JitterBuffer, SilenceSuppressor, hold_tone
+from audio_tap import TRACK_INBOUND, TRACK_OUTBOUND, open_tap
+from call_recorder import CHANNEL_DEEPGRAM, CHANNEL_TWILIO, open_recorder
+import greeting_cache
+
+# Per-call registry: call_sid -> {"stream_sid", "started_at", "state"} for calls with an agent session
+CALL_SESSIONS = {}
+# How long cancelled call tasks get to finish before they count as leaked
+CALL_TEARDOWN_TIMEOUT_SECONDS = float(os.getenv("CALL_TEARDOWN_TIMEOUT_SECONDS", "5"))
+session_stats = {
+    "started": 0,
+    "ended": 0,
+    "leaked_tasks": 0,  # Tasks that ignored cancellation at teardown
+    "inbound_bytes_suppressed": 0,  # Caller silence not sent to Deepgram
+    "inbound_frames_late": 0,  # Caller frames that arrived after their gap was filled
+    "inbound_frames_lost": 0,  # Caller frames that never arrived
+    "inbound_frames_duplicate": 0  # Caller frames received twice
 }
 
 # Call queue tracking
 ACTIVE_CALLS = set()  # Track unique call SIDs to prevent double-counting
 
+# Admission control: calls beyond the limit wait in FIFO order for a free agent session
+MAX_CONCURRENT_CALLS = max(1, int(os.getenv("MAX_CONCURRENT_CALLS", "10")))
+HOLD_AUDIO_FILE = os.getenv("HOLD_AUDIO_FILE")  # Raw 8 kHz mu-law clip, looped while waiting
+WAITING_CALLS = deque()  # (call_sid, admission future) in arrival order
+CALL_ADMITTED_AT = {}  # call_sid -> monotonic time the call got an agent session
+
+# Inbound audio chunking toward Deepgram (Twilio sends 20 ms frames)
+INBOUND_CHUNK_MS = int(os.getenv("INBOUND_CHUNK_MS", "20"))
+INBOUND_ADAPTIVE_CHUNKING = os.getenv("INBOUND_ADAPTIVE_CHUNKING", "false").lower() == "true"
+INBOUND_SILENCE_CHUNK_MS = int(os.getenv("INBOUND_SILENCE_CHUNK_MS", "400"))
+INBOUND_JITTER_WINDOW_FRAMES = int(os.getenv("INBOUND_JITTER_WINDOW_FRAMES", "1"))  # Reordering delay, at most
+
+# Sustained caller silence replaced by KeepAlive messages toward Deepgram
+INBOUND_SILENCE_SUPPRESSION = os.getenv("INBOUND_SILENCE_SUPPRESSION", "false").lower() == "true"
+INBOUND_SILENCE_THRESHOLD = int(os.getenv("INBOUND_SILENCE_THRESHOLD", "500"))  # RMS below this is silence
+INBOUND_SILENCE_HANGOVER_MS = int(os.getenv("INBOUND_SILENCE_HANGOVER_MS", "1500"))  # Silence still sent after speech
+INBOUND_SILENCE_PREROLL_MS = int(os.getenv("INBOUND_SILENCE_PREROLL_MS", "200"))  # Audio sent ahead of a speech onset
+INBOUND_KEEPALIVE_MS = int(os.getenv("INBOUND_KEEPALIVE_MS", "5000"))
+KEEPALIVE_MESSAGE = json.dumps({"type": "KeepAlive"})
+
+# Outbound agent audio toward Twilio
+OUTBOUND_FRAMES_PER_MESSAGE = int(os.getenv("OUTBOUND_FRAMES_PER_MESSAGE", "5"))  # 20 ms frames per media event
+OUTBOUND_MAX_LEAD_MS = int(os.getenv("OUTBOUND_MAX_LEAD_MS", "300"))  # How far ahead of playback Twilio may be fed
+
+# How often completed orders are moved out of memory into the archive
+ORDER_ARCHIVE_INTERVAL_SECONDS = int(os.getenv("ORDER_ARCHIVE_INTERVAL_SECONDS", "300"))
+
+# Function call results, so a FunctionCallRequest the agent re-sends is answered without running again
+FUNCTION_RESULT_CACHE_SIZE = int(os.getenv("FUNCTION_RESULT_CACHE_SIZE", "1024"))
+FUNCTION_RESULT_TTL_SECONDS = float(os.getenv("FUNCTION_RESULT_TTL_SECONDS", "600"))
+# Functions that place an order, after which the call ends once the grace period runs out
+ORDER_PLACING_FUNCTIONS = {"place_pizza_order", "reorder_last_order"}
+# Read-only functions are also cached by their arguments, briefly, since order status can change
+READ_ONLY_FUNCTIONS = {"get_menu", "lookup_order", "get_customer_orders"}
+READ_ONLY_RESULT_TTL_SECONDS = float(os.getenv("READ_ONLY_RESULT_TTL_SECONDS", "15"))
+function_results = OrderedDict()  # cache key -> (monotonic expiry, FunctionCallResponse), oldest first
+
+# Running average call length, used to estimate queue wait times
+call_duration_stats = {
+    "average_seconds": float(os.getenv("EXPECTED_CALL_SECONDS", "180")),
+    "completed_calls": 0
+}
+
 class DashboardHTTPHandler(BaseHTTPRequestHandler):
     """HTTP request handler for dashboard API endpoints"""
     
@@ -43,6 +100,18 @@ class DashboardHTTPHandler(BaseHTTPRequestHandler):
             dashboard_data = FUNCTION_MAP['get_dashboard_data']()
             self.wfile.write(json.dumps(dashboard_data).encode())
             
+        elif path == '/api/analytics':
+            self.send_response(200)
+            self.send_header('Content-type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+            self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+            self.end_headers()
+            
+            # Served from running aggregates, constant time regardless of order count
+            analytics = FUNCTION_MAP['get_analytics']()
+            self.wfile.write(json.dumps(analytics).encode())
+            
         elif path == '/api/health':
             self.send_response(200)
             self.send_header('Content-type', 'application/json')
@@ -50,7 +119,7 @@ class DashboardHTTPHandler(BaseHTTPRequestHandler):
             self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
             self.send_header('Access-Control-Allow-Headers', 'Content-Type')
             self.end_headers()
-            self.wfile.write(json.dumps({"status": "healthy"}).encode())
+            self.wfile.write(json.dumps(get_health()).encode())
             
         else:
             self.send_response(404)
@@ -91,6 +160,42 @@ class DashboardHTTPHandler(BaseHTTPRequestHandler):
                 self.end_headers()
                 self.wfile.write(json.dumps({"error": "Invalid order ID"}).encode())
                 
+        elif path == '/api/orders/bulk-status':
+            # Body: {"updates": [{"order_id": 1, "kitchen_status": "ready"}, ...]}
+            # or {"order_ids": [1, 2], "kitchen_status": "completed"} to move several to one status
+            content_length = int(self.headers['Content-Length'])
+            post_data = self.rfile.read(content_length)
+            
+            try:
+                data = json.loads(post_data.decode())
+                updates = data.get('updates')
+                if updates is None:
+                    updates = [
+                        {"order_id": order_id, "kitchen_status": data.get('kitchen_status')}
+                        for order_id in data.get('order_ids', [])
+                    ]
+                if not isinstance(updates, list) or not all(isinstance(update, dict) for update in updates):
+                    raise ValueError("updates must be a list of objects")
+                
+                result = FUNCTION_MAP['update_order_statuses'](updates)
+                
+                self.send_response(200)
+                self.send_header('Content-type', 'application/json')
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+                self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+                self.end_headers()
+                self.wfile.write(json.dumps(result).encode())
+                
+            except (json.JSONDecodeError, AttributeError, TypeError, ValueError):
+                self.send_response(400)
+                self.send_header('Content-type', 'application/json')
+                self.send_header('Access-Control-Allow-Origin', '*')
+                self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+                self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+                self.end_headers()
+                self.wfile.write(json.dumps({"error": "Expected JSON with 'updates' or 'order_ids' and 'kitchen_status'"}).encode())
+                
         elif path == '/api/queue/update':
             # Read request body
             content_length = int(self.headers['Content-Length'])
@@ -100,7 +205,8 @@ class DashboardHTTPHandler(BaseHTTPRequestHandler):
                 data = json.loads(post_data.decode())
                 result = FUNCTION_MAP['update_call_queue'](
                     active_calls=data.get('active_calls'),
-                    customers_waiting=data.get('customers_waiting')
+                    customers_waiting=data.get('customers_waiting'),
+                    estimated_wait_seconds=data.get('estimated_wait_seconds')
                 )
                 
                 self.send_response(200)
@@ -165,9 +271,20 @@ def load_config():
         return json.load(f)
 
 
+def warm_twilio_import():
+    """Import the Twilio SDK in the background so the first hangup doesn't pay for it."""
+    try:
+        import twilio.rest  # noqa: F401
+    except Exception as e:
+        print(f"Could not import the Twilio SDK: {e}")
+
+
 def end_twilio_call(call_sid):
-    """End a Twilio call using the REST API."""
+    """End a Twilio call using the REST API. Blocking: run it off the event loop."""
     try:
+        # Imported here: the Twilio SDK is slow to import, so it is warmed in the background after startup
+        from twilio.rest import Client
+
         account_sid = os.getenv("TWILIO_ACCOUNT_SID")
         auth_token = os.getenv("TWILIO_AUTH_TOKEN")
         
@@ -178,42 +295,267 @@ def end_twilio_call(call_sid):
         client = Client(account_sid, auth_token)
         call = client.calls(call_sid).update(status='completed')
         print(f"Call {call_sid} ended successfully")
-        
-        # Track call end for dashboard
-        global ACTIVE_CALLS
-        if call_sid in ACTIVE_CALLS:
-            ACTIVE_CALLS.remove(call_sid)
-            current_count = len(ACTIVE_CALLS)
-            try:
-                FUNCTION_MAP['update_call_queue'](active_calls=current_count)
-                print(f"Grace period call ended: {call_sid}. Active calls: {current_count}")
-            except Exception as e:
-                print(f"Error updating call queue on grace period end: {e}")
-        
         return True
     except Exception as e:
         print(f"Error ending call {call_sid}: {e}")
         return False
     
 
-async def handle_barge_in(decoded, twilio_ws, streamsid):
+def twilio_media_message(streamsid, raw_mulaw):
+    """Wrap raw mu-law audio in a Twilio media stream event."""
+    return json.dumps({
+        "event": "media",
+        "streamSid": streamsid,
+        "media": {"payload": base64.b64encode(raw_mulaw).decode("ascii")}
+    })
+
+
+class OutboundAudio:
+    """Per-call stage that coalesces agent audio into frame-aligned media events and paces them to Twilio.
+
+    Only OUTBOUND_MAX_LEAD_MS of audio is ever handed to Twilio ahead of playback;
+    the rest waits here so a barge-in can drop it instantly with flush(). Media
+    events always carry whole 20 ms frames; a trailing partial frame is held
+    until more audio arrives or end_of_speech() pads it out with silence.
+    """
+
+    def __init__(self, twilio_ws, streamsid, tap=None):
+        self.twilio_ws = twilio_ws
+        self.streamsid = streamsid
+        self.tap = tap
+        self.message_bytes = FRAME_BYTES * max(1, OUTBOUND_FRAMES_PER_MESSAGE)
+        self.max_lead = OUTBOUND_MAX_LEAD_MS / 1000
+        self.buffer = bytearray()
+        self.data_ready = asyncio.Event()
+        self.playback_end = 0.0  # Loop time at which audio already sent finishes playing
+        self.finished_bytes = 0  # Buffered bytes from turns the agent has finished speaking
+        self.stats = {"messages_sent": 0, "bytes_sent": 0, "bytes_dropped": 0}
+
+    def push(self, raw_mulaw):
+        """Queue agent audio for sending."""
+        self.buffer.extend(raw_mulaw)
+        self.data_ready.set()
+
+    def end_of_speech(self):
+        """The agent finished speaking: send the trailing partial frame, padded with silence."""
+        self.finished_bytes = len(self.buffer)
+        self.data_ready.set()
+
+    def flush(self):
+        """Drop all unsent audio, returning the number of bytes dropped."""
+        dropped = len(self.buffer)
+        self.buffer.clear()
+        self.finished_bytes = 0
+        self.playback_end = 0.0
+        self.stats["bytes_dropped"] += dropped
+        return dropped
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self.buffer:
+                self.data_ready.clear()
+                await self.data_ready.wait()
+                continue
+
+            lead = self.playback_end - loop.time()
+            if lead > self.max_lead:
+                await asyncio.sleep(lead - self.max_lead)
+                continue
+
+            if self.finished_bytes:
+                # Audio of a finished turn goes out as is, up to its last (padded) frame
+                size = min(self.message_bytes, self.finished_bytes)
+                self.finished_bytes -= size
+            elif len(self.buffer) >= self.message_bytes:
+                size = self.message_bytes
+            else:
+                # Give the agent a frame's time to fill the message before sending a short one
+                self.data_ready.clear()
+                try:
+                    await asyncio.wait_for(self.data_ready.wait(), FRAME_MS / 1000)
+                    continue
+                except asyncio.TimeoutError:
+                    size = len(self.buffer) // FRAME_BYTES * FRAME_BYTES
+                if not size:
+                    # Less than a frame left mid-turn: wait for more audio or the end of the turn
+                    await self.data_ready.wait()
+                    continue
+
+            chunk = bytes(self.buffer[:size])
+            del self.buffer[:size]
+            # Only the end of a turn leaves a partial frame; pad it so playback stays frame-aligned
+            chunk += bytes([MULAW_SILENCE]) * (-len(chunk) % FRAME_BYTES)
+            self.playback_end = max(self.playback_end, loop.time()) + len(chunk) / SAMPLE_RATE
+            await self.twilio_ws.send(twilio_media_message(self.streamsid, chunk))
+            if self.tap:
+                self.tap.write(TRACK_OUTBOUND, chunk)
+            self.stats["messages_sent"] += 1
+            self.stats["bytes_sent"] += len(chunk)
+
+
+def publish_call_queue():
+    """Push active/waiting counts and the wait estimate to the dashboard call queue."""
+    try:
+        FUNCTION_MAP['update_call_queue'](
+            active_calls=len(ACTIVE_CALLS),
+            customers_waiting=len(WAITING_CALLS),
+            estimated_wait_seconds=estimate_wait_seconds(len(WAITING_CALLS))
+        )
+    except Exception as e:
+        print(f"Error updating call queue: {e}")
+
+
+def estimate_wait_seconds(position):
+    """Estimate how long the caller at a 1-based queue position will wait for an agent.
+
+    Each active call is expected to run for the average call length, so its slot
+    frees up once its remaining time is over; after that every slot serves one
+    more caller per average call.
+    """
+    if position <= 0:
+        return 0
+    average = call_duration_stats["average_seconds"]
+    now = time.monotonic()
+    releases = [max(0.0, average - (now - admitted_at)) for admitted_at in CALL_ADMITTED_AT.values()]
+    releases += [0.0] * (MAX_CONCURRENT_CALLS - len(releases))
+    heapq.heapify(releases)
+    for _ in range(position - 1):
+        heapq.heapreplace(releases, releases[0] + average)
+    return int(releases[0])
+
+
+def admit_call(call_sid):
+    """Give a call one of the agent session slots."""
+    ACTIVE_CALLS.add(call_sid)
+    CALL_ADMITTED_AT[call_sid] = time.monotonic()
+    print(f"Call started: {call_sid}. Active calls: {len(ACTIVE_CALLS)}")
+    publish_call_queue()
+
+
+def release_call_slot(call_sid):
+    """Free a call's agent session slot and admit the next waiting caller (idempotent)."""
+    if call_sid not in ACTIVE_CALLS:
+        return
+    ACTIVE_CALLS.remove(call_sid)
+    admitted_at = CALL_ADMITTED_AT.pop(call_sid, None)
+    if admitted_at is not None:
+        # Exponential moving average so the wait estimate follows the current call mix
+        duration = time.monotonic() - admitted_at
+        call_duration_stats["average_seconds"] = 0.8 * call_duration_stats["average_seconds"] + 0.2 * duration
+        call_duration_stats["completed_calls"] += 1
+    print(f"Call ended: {call_sid}. Active calls: {len(ACTIVE_CALLS)}")
+
+    while WAITING_CALLS and len(ACTIVE_CALLS) < MAX_CONCURRENT_CALLS:
+        next_call_sid, slot = WAITING_CALLS.popleft()
+        if slot.done():
+            continue
+        admit_call(next_call_sid)
+        slot.set_result(True)
+    publish_call_queue()
+
+
+def load_hold_audio():
+    """Load the hold clip, padded to whole seconds so it loops cleanly in one-second chunks."""
+    clip = hold_tone()
+    if HOLD_AUDIO_FILE:
+        try:
+            with open(HOLD_AUDIO_FILE, "rb") as f:
+                clip = f.read() or clip
+        except OSError as e:
+            print(f"Could not read hold audio {HOLD_AUDIO_FILE}: {e}. Using default tone.")
+    padding = -len(clip) % SAMPLE_RATE
+    return clip + bytes([MULAW_SILENCE]) * padding
+
+
+HOLD_AUDIO = None  # Rendered when the first caller has to wait, not at startup
+
+
+async def stream_hold_audio(twilio_ws, streamsid):
+    """Loop hold audio to a queued caller, one second at a time."""
+    global HOLD_AUDIO
+    if HOLD_AUDIO is None:
+        HOLD_AUDIO = load_hold_audio()
+    position = 0
+    while True:
+        chunk = HOLD_AUDIO[position:position + SAMPLE_RATE]
+        position = (position + SAMPLE_RATE) % len(HOLD_AUDIO)
+        await twilio_ws.send(twilio_media_message(streamsid, chunk))
+        await asyncio.sleep(1)
+
+
+async def wait_for_hangup(twilio_ws):
+    """Drain caller events while on hold, returning once the stream stops."""
+    async for message in twilio_ws:
+        if json.loads(message)["event"] == "stop":
+            return
+
+
+async def wait_for_start(twilio_ws):
+    """Read Twilio events until the stream start event arrives."""
+    async for message in twilio_ws:
+        data = json.loads(message)
+        if data["event"] == "start":
+            return data["start"]
+    return None
+
+
+async def wait_for_call_slot(call_sid, twilio_ws, streamsid):
+    """Admit the call, holding it in the FIFO waiting queue while at capacity.
+
+    Returns False if the caller hangs up before a slot frees up.
+    """
+    if not WAITING_CALLS and len(ACTIVE_CALLS) < MAX_CONCURRENT_CALLS:
+        admit_call(call_sid)
+        return True
+
+    slot = asyncio.get_running_loop().create_future()
+    WAITING_CALLS.append((call_sid, slot))
+    position = len(WAITING_CALLS)
+    print(f"At capacity ({MAX_CONCURRENT_CALLS} calls). Call {call_sid} waiting at position {position}, "
+          f"estimated wait {estimate_wait_seconds(position)}s")
+    publish_call_queue()
+
+    hold_task = asyncio.ensure_future(stream_hold_audio(twilio_ws, streamsid))
+    hangup_task = asyncio.ensure_future(wait_for_hangup(twilio_ws))
+    try:
+        await asyncio.wait([slot, hangup_task], return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        hold_task.cancel()
+        hangup_task.cancel()
+        if not slot.done():
+            slot.cancel()
+            WAITING_CALLS.remove((call_sid, slot))
+            print(f"Caller hung up while waiting: {call_sid}")
+            publish_call_queue()
+
+    if slot.cancelled():
+        return False
+
+    # Drop any hold audio still buffered at Twilio before the agent speaks
+    await twilio_ws.send(json.dumps({"event": "clear", "streamSid": streamsid}))
+    return True
+
+
+async def handle_barge_in(decoded, twilio_ws, outbound):
     if decoded["type"] == "UserStartedSpeaking":
+        # Drop agent audio we haven't sent yet, then tell Twilio to drop what it has buffered
+        outbound.flush()
         clear_message = {
             "event": "clear",
-            "streamSid": streamsid
+            "streamSid": outbound.streamsid
         }
         await twilio_ws.send(json.dumps(clear_message))
 
 
-def execute_function_call(func_name, arguments):
-    global conversation_state
-    
+async def execute_function_call(func_name, arguments, conversation_state=None):
     if func_name in FUNCTION_MAP:
-        result = FUNCTION_MAP[func_name](**arguments)
+        # Order functions wait on the orders lock and may scan the archive on disk
+        result = await asyncio.to_thread(FUNCTION_MAP[func_name], **arguments)
         print(f"Function call result: {result}")
         
         # Check if an order was successfully placed
-        if func_name == "place_pizza_order" and "order_id" in result:
+        if func_name in ORDER_PLACING_FUNCTIONS and "order_id" in result and conversation_state is not None:
             conversation_state["order_placed"] = True
             conversation_state["grace_period_start"] = asyncio.get_event_loop().time()
             print("Order placed successfully - starting grace period for call termination")
@@ -234,7 +576,36 @@ def create_function_call_response(func_id, func_name, result):
     }
 
 
-async def handle_function_call_request(decoded, sts_ws):
+def cached_function_response(key):
+    """Return a cached FunctionCallResponse that has not expired, or None."""
+    entry = function_results.get(key)
+    if entry is None:
+        return None
+    expires_at, response = entry
+    if expires_at <= time.monotonic():
+        del function_results[key]
+        return None
+    function_results.move_to_end(key)
+    return response
+
+
+def cache_function_response(key, response, ttl):
+    function_results[key] = (time.monotonic() + ttl, response)
+    function_results.move_to_end(key)
+    while len(function_results) > FUNCTION_RESULT_CACHE_SIZE:
+        function_results.popitem(last=False)
+
+
+def function_call_keys(session_id, func_name, func_id, arguments):
+    """Cache keys for a call: by request ID, plus by argument hash for read-only functions."""
+    id_key = (session_id, func_id)
+    if func_name not in READ_ONLY_FUNCTIONS:
+        return id_key, None
+    digest = hashlib.sha256(json.dumps(arguments, sort_keys=True).encode()).hexdigest()
+    return id_key, (session_id, func_name, digest)
+
+
+async def handle_function_call_request(decoded, sts_ws, session_id=None):
     try:
         for function_call in decoded["functions"]:
             func_name = function_call["name"]
@@ -242,10 +613,25 @@ async def handle_function_call_request(decoded, sts_ws):
             arguments = json.loads(function_call["arguments"])
 
             print(f"Function call: {func_name} (ID: {func_id}), arguments: {arguments}")
+
+            id_key, args_key = function_call_keys(session_id, func_name, func_id, arguments)
+            function_result = cached_function_response(id_key)
+            if function_result is None and args_key:
+                function_result = cached_function_response(args_key)
+                if function_result is not None:
+                    function_result = dict(function_result, id=func_id)
+            if function_result is not None:
+                await sts_ws.send(json.dumps(function_result))
+                print(f"Sent cached function result for {func_name} (ID: {func_id})")
+                continue
     
-            result = execute_function_call(func_name, arguments)
+            session = CALL_SESSIONS.get(session_id)
+            result = await execute_function_call(func_name, arguments, session["state"] if session else None)
 
             function_result = create_function_call_response(func_id, func_name, result)
+            cache_function_response(id_key, function_result, FUNCTION_RESULT_TTL_SECONDS)
+            if args_key:
+                cache_function_response(args_key, function_result, READ_ONLY_RESULT_TTL_SECONDS)
             await sts_ws.send(json.dumps(function_result))
             print(f"Sent function result: {function_result}")
 
@@ -259,11 +645,14 @@ async def handle_function_call_request(decoded, sts_ws):
         await sts_ws.send(json.dumps(error_result))
 
 
-async def handle_text_message(decoded, twilio_ws, sts_ws, streamsid):
-    await handle_barge_in(decoded, twilio_ws, streamsid)
+async def handle_text_message(decoded, twilio_ws, sts_ws, outbound, session_id=None):
+    await handle_barge_in(decoded, twilio_ws, outbound)
+
+    if decoded["type"] == "AgentAudioDone":
+        outbound.end_of_speech()
+    elif decoded["type"] == "FunctionCallRequest":
+        await handle_function_call_request(decoded, sts_ws, session_id)
 
-    if decoded["type"] == "FunctionCallRequest":
-        await handle_function_call_request(decoded, sts_ws)
 
 async def sts_sender(sts_ws, audio_queue):
     print("sts_sender started")
@@ -272,13 +661,9 @@ async def sts_sender(sts_ws, audio_queue):
         await sts_ws.send(chunk)
 
 
-async def call_monitor(call_info_queue, twilio_ws):
+async def call_monitor(call_sid, twilio_ws):
     """Monitor conversation state and handle call termination."""
-    global conversation_state
-    
-    # Wait for call info
-    call_info = await call_info_queue.get()
-    call_sid = call_info["call_sid"]
+    conversation_state = CALL_SESSIONS[call_sid]["state"]
     
     GRACE_PERIOD = 30  # 30 seconds after order completion
     
@@ -294,7 +679,9 @@ async def call_monitor(call_info_queue, twilio_ws):
                 conversation_state["call_should_end"] = True
                 
                 # End the call
-                if end_twilio_call(call_sid):
+                if await asyncio.to_thread(end_twilio_call, call_sid):
+                    # Track call end for dashboard
+                    release_call_slot(call_sid)
                     break
                 else:
                     # Fallback: close WebSocket if REST API fails
@@ -302,139 +689,276 @@ async def call_monitor(call_info_queue, twilio_ws):
                     break
 
 
-async def sts_receiver(sts_ws, twilio_ws, streamsid_queue):
+async def sts_receiver(sts_ws, twilio_ws, outbound, session_id=None):
     print("sts_receiver started")
-    streamsid = await streamsid_queue.get()
 
     async for message in sts_ws:
         if type(message) is str:
             print(message)
             decoded = json.loads(message)
-            await handle_text_message(decoded, twilio_ws, sts_ws, streamsid)
+            await handle_text_message(decoded, twilio_ws, sts_ws, outbound, session_id)
             continue
 
         raw_mulaw = message
 
-        media_message = {
-            "event": "media",
-            "streamSid": streamsid,
-            "media": {"payload": base64.b64encode(raw_mulaw).decode("ascii")}
-        }
+        outbound.push(raw_mulaw)
 
-        await twilio_ws.send(json.dumps(media_message))
 
+def create_inbound_chunker():
+    """Build the inbound chunker from the deployment's chunking settings."""
+    return InboundChunker(
+        chunk_ms=INBOUND_CHUNK_MS,
+        adaptive=INBOUND_ADAPTIVE_CHUNKING,
+        silence_chunk_ms=INBOUND_SILENCE_CHUNK_MS
+    )
 
-async def twilio_receiver(twilio_ws, audio_queue, streamsid_queue, call_info_queue):
-    BUFFER_SIZE = 20 * 160
-    inbuffer = bytearray(b"")
-    current_call_sid = None  # Track the current call SID
 
-    async for message in twilio_ws:
-        try:
-            data = json.loads(message)
-            event = data["event"]
-
-            if event == "start":
-                print("Get our streamsid")
-                start = data["start"]
-                streamsid = start["streamSid"]
-                call_sid = start["callSid"]
-                current_call_sid = call_sid  # Store for later use
-                streamsid_queue.put_nowait(streamsid)
-                call_info_queue.put_nowait({"call_sid": call_sid, "stream_sid": streamsid})
-                print(f"Call SID: {call_sid}, Stream SID: {streamsid}")
-                
-                # Track call start for dashboard
-                global ACTIVE_CALLS
-                if call_sid not in ACTIVE_CALLS:
-                    ACTIVE_CALLS.add(call_sid)
-                    current_count = len(ACTIVE_CALLS)
-                    try:
-                        FUNCTION_MAP['update_call_queue'](active_calls=current_count)
-                        print(f"Call started: {call_sid}. Active calls: {current_count}")
-                    except Exception as e:
-                        print(f"Error updating call queue on start: {e}")
-            elif event == "connected":
-                continue
-            elif event == "media":
-                media = data["media"]
-                chunk = base64.b64decode(media["payload"])
-                if media["track"] == "inbound":
-                    inbuffer.extend(chunk)
-            elif event == "stop":
-                # Track call end for dashboard
-                if current_call_sid and current_call_sid in ACTIVE_CALLS:
-                    ACTIVE_CALLS.remove(current_call_sid)
-                    current_count = len(ACTIVE_CALLS)
-                    try:
-                        FUNCTION_MAP['update_call_queue'](active_calls=current_count)
-                        print(f"Call ended: {current_call_sid}. Active calls: {current_count}")
-                    except Exception as e:
-                        print(f"Error updating call queue on stop: {e}")
-                break
+def create_silence_suppressor():
+    """Build the silence suppressor, or None when suppression is disabled."""
+    if not INBOUND_SILENCE_SUPPRESSION:
+        return None
+    return SilenceSuppressor(
+        threshold=INBOUND_SILENCE_THRESHOLD,
+        hangover_ms=INBOUND_SILENCE_HANGOVER_MS,
+        preroll_ms=INBOUND_SILENCE_PREROLL_MS,
+        keepalive_ms=INBOUND_KEEPALIVE_MS
+    )
 
-            while len(inbuffer) >= BUFFER_SIZE:
-                chunk = inbuffer[:BUFFER_SIZE]
-                audio_queue.put_nowait(chunk)
-                inbuffer = inbuffer[BUFFER_SIZE:]
-        except:
-            # Handle unexpected disconnection - clean up call tracking
-            if current_call_sid and current_call_sid in ACTIVE_CALLS:
-                ACTIVE_CALLS.remove(current_call_sid)
-                current_count = len(ACTIVE_CALLS)
-                try:
-                    FUNCTION_MAP['update_call_queue'](active_calls=current_count)
-                    print(f"Call disconnected unexpectedly: {current_call_sid}. Active calls: {current_count}")
-                except Exception as e:
-                    print(f"Error updating call queue on disconnect: {e}")
-            break
-
-async def twilio_handler(twilio_ws):
-    global conversation_state
-    
-    # Reset conversation state for new call
-    conversation_state = {
+
+def forward_inbound_audio(chunk, chunker, suppressor, audio_queue):
+    """Pass a caller frame through silence suppression and chunking into the send queue."""
+    if suppressor:
+        was_suppressing = suppressor.suppressing
+        chunk = suppressor.push(chunk)
+        if not chunk:
+            if not was_suppressing:
+                # Send the partial chunk that ends the turn rather than holding it through the silence
+                for ready in chunker.flush():
+                    audio_queue.put_nowait(ready)
+            if suppressor.keepalive_due():
+                audio_queue.put_nowait(KEEPALIVE_MESSAGE)
+            return
+    for ready in chunker.push(chunk):
+        audio_queue.put_nowait(ready)
+
+
+def media_number(data):
+    """Position of a media frame in its track: the per-track chunk counter, else the message sequence number."""
+    number = data["media"].get("chunk") or data.get("sequenceNumber")
+    return int(number) if number is not None else None
+
+
+async def twilio_receiver(twilio_ws, audio_queue, call_sid, tap=None):
+    chunker = create_inbound_chunker()
+    suppressor = create_silence_suppressor()
+    jitter = JitterBuffer(window=INBOUND_JITTER_WINDOW_FRAMES)
+
+    try:
+        async for message in twilio_ws:
+            try:
+                data = json.loads(message)
+                event = data["event"]
+
+                if event == "media":
+                    media = data["media"]
+                    chunk = base64.b64decode(media["payload"])
+                    if media["track"] == "inbound":
+                        if tap:
+                            tap.write(TRACK_INBOUND, chunk)
+                        number = media_number(data)
+                        frames = jitter.push(number, chunk) if number is not None else [chunk]
+                        for frame in frames:
+                            forward_inbound_audio(frame, chunker, suppressor, audio_queue)
+                elif event == "stop":
+                    # Forward frames still held for reordering before the call ends
+                    for frame in jitter.flush():
+                        forward_inbound_audio(frame, chunker, suppressor, audio_queue)
+                    # Track call end for dashboard
+                    release_call_slot(call_sid)
+                    break
+            except:
+                # Handle unexpected disconnection - clean up call tracking
+                print(f"Call disconnected unexpectedly: {call_sid}")
+                release_call_slot(call_sid)
+                break
+    finally:
+        session_stats["inbound_frames_late"] += jitter.late
+        session_stats["inbound_frames_lost"] += jitter.lost
+        session_stats["inbound_frames_duplicate"] += jitter.duplicates
+        if jitter.late or jitter.lost or jitter.duplicates:
+            print(f"Inbound jitter for {call_sid}: {jitter.stats}")
+        if suppressor:
+            session_stats["inbound_bytes_suppressed"] += suppressor.bytes_suppressed
+            print(f"Inbound silence for {call_sid}: {suppressor.stats}")
+
+
+def new_conversation_state():
+    return {
         "order_placed": False,
         "call_should_end": False,
         "grace_period_start": None
     }
-    
-    audio_queue = asyncio.Queue()
-    streamsid_queue = asyncio.Queue()
-    call_info_queue = asyncio.Queue()
 
-    async with sts_connect() as sts_ws:
-        config_message = load_config()
-        await sts_ws.send(json.dumps(config_message))
-
-        await asyncio.wait(
-            [
-                asyncio.ensure_future(sts_sender(sts_ws, audio_queue)),
-                asyncio.ensure_future(sts_receiver(sts_ws, twilio_ws, streamsid_queue)),
-                asyncio.ensure_future(twilio_receiver(twilio_ws, audio_queue, streamsid_queue, call_info_queue)),
-                asyncio.ensure_future(call_monitor(call_info_queue, twilio_ws))
-            ]
-        )
 
+def register_call_session(call_sid, streamsid):
+    CALL_SESSIONS[call_sid] = {
+        "stream_sid": streamsid,
+        "started_at": time.monotonic(),
+        "state": new_conversation_state()
+    }
+    session_stats["started"] += 1
+
+
+def unregister_call_session(call_sid):
+    if CALL_SESSIONS.pop(call_sid, None) is not None:
+        session_stats["ended"] += 1
+
+
+def get_health():
+    """Health status including call session bookkeeping, so leaked sessions show up."""
+    now = time.monotonic()
+    started_at = [session["started_at"] for session in list(CALL_SESSIONS.values())]
+    return {
+        "status": "healthy" if session_stats["leaked_tasks"] == 0 else "degraded",
+        "active_sessions": len(started_at),
+        "oldest_session_seconds": round(now - min(started_at), 1) if started_at else 0,
+        "sessions_started": session_stats["started"],
+        "sessions_ended": session_stats["ended"],
+        "leaked_tasks": session_stats["leaked_tasks"],
+        "inbound_bytes_suppressed": session_stats["inbound_bytes_suppressed"],
+        "inbound_frames_late": session_stats["inbound_frames_late"],
+        "inbound_frames_lost": session_stats["inbound_frames_lost"],
+        "inbound_frames_duplicate": session_stats["inbound_frames_duplicate"]
+    }
+
+
+def report_task_failures(call_sid, tasks):
+    for task in tasks:
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Call {call_sid}: {task.get_name()} failed: {task.exception()!r}")
+
+
+async def supervise_call(call_sid, jobs):
+    """Run a call's tasks until any one of them ends, then cancel and reap the rest.
+
+    Every task is essential: the call is over once the caller hangs up, the agent
+    socket closes, the monitor ends the call or anything fails.
+    """
+    tasks = [job if isinstance(job, asyncio.Task) else asyncio.create_task(job, name=job.__qualname__)
+             for job in jobs]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        print(f"Call {call_sid}: {', '.join(task.get_name() for task in done)} finished, tearing down")
+    finally:
+        pending = [task for task in tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            _, stuck = await asyncio.wait(pending, timeout=CALL_TEARDOWN_TIMEOUT_SECONDS)
+            if stuck:
+                session_stats["leaked_tasks"] += len(stuck)
+                print(f"Call {call_sid}: {len(stuck)} tasks still running after teardown: "
+                      f"{', '.join(task.get_name() for task in stuck)}")
+        report_task_failures(call_sid, [task for task in tasks if task.done()])
+
+
+async def twilio_handler(twilio_ws, connect=sts_connect):
+    recorder = open_recorder()
+    if recorder:
+        twilio_ws = recorder.wrap(twilio_ws, CHANNEL_TWILIO)
+
+    call_sid = None
+    tap = None
+    outbound_task = None
+    try:
+        start = await wait_for_start(twilio_ws)
+        if start is None:
+            return
+        streamsid = start["streamSid"]
+        call_sid = start["callSid"]
+        print(f"Call SID: {call_sid}, Stream SID: {streamsid}")
+        if recorder:
+            recorder.call_sid = call_sid
+
+        if not await wait_for_call_slot(call_sid, twilio_ws, streamsid):
+            return
+
+        register_call_session(call_sid, streamsid)
+        audio_queue = asyncio.Queue()
+        tap = open_tap(call_sid)
+        outbound = OutboundAudio(twilio_ws, streamsid, tap)
+        config_message = load_config()
+        greeting = greeting_cache.greeting_clip()
+        if greeting:
+            # The caller hears the cached greeting while the agent connects; agent audio queues behind it
+            outbound.push(greeting)
+            outbound.end_of_speech()
+            config_message = greeting_cache.without_greeting(config_message)
+        outbound_task = asyncio.create_task(outbound.run(), name="OutboundAudio.run")
+
+        async with connect() as sts_ws:
+            if recorder:
+                sts_ws = recorder.wrap(sts_ws, CHANNEL_DEEPGRAM)
+            await sts_ws.send(json.dumps(config_message))
+
+            await supervise_call(call_sid, [
+                sts_sender(sts_ws, audio_queue),
+                sts_receiver(sts_ws, twilio_ws, outbound, call_sid),
+                outbound_task,
+                twilio_receiver(twilio_ws, audio_queue, call_sid, tap),
+                call_monitor(call_sid, twilio_ws)
+            ])
+            await sts_ws.close()
+            print(f"Outbound audio for {call_sid}: {outbound.stats}")
+    finally:
+        if outbound_task:
+            outbound_task.cancel()
+        # Frees the slot for the next waiting caller however the call ended
+        unregister_call_session(call_sid)
+        release_call_slot(call_sid)
         await twilio_ws.close()
+        if tap:
+            tap.close()
+        if recorder:
+            await recorder.close()
+
+
+async def order_retention_loop():
+    """Periodically archive old completed orders, off the event loop."""
+    while True:
+        await asyncio.sleep(ORDER_ARCHIVE_INTERVAL_SECONDS)
+        try:
+            result = await asyncio.to_thread(archive_completed_orders)
+            if result["archived"]:
+                print(f"Archived {result['archived']} completed orders. {result['remaining']} orders in memory")
+        except Exception as e:
+            print(f"Error archiving orders: {e}")
 
 
 async def main():
     # Reset call queue on server startup
     global ACTIVE_CALLS
     ACTIVE_CALLS.clear()
-    FUNCTION_MAP['update_call_queue'](active_calls=0, customers_waiting=0)
+    WAITING_CALLS.clear()
+    FUNCTION_MAP['update_call_queue'](active_calls=0, customers_waiting=0, estimated_wait_seconds=0)
     print("Call queue reset to 0 on server startup")
     
     # Start HTTP server in a separate thread
     http_thread = threading.Thread(target=start_http_server, daemon=True)
     http_thread.start()
     
+    retention_task = asyncio.ensure_future(order_retention_loop())
+    greeting_cache.start_loading(load_config(), os.getenv("DEEPGRAM_API_KEY"))
+    
     # Start WebSocket server
     await websockets.serve(twilio_handler, "localhost", 5000)
-    print("Started WebSocket server on localhost:5000")
+    print(f"Started WebSocket server on localhost:5000 (max {MAX_CONCURRENT_CALLS} concurrent calls)")
     print("Dashboard API available at http://localhost:8000")
-    await asyncio.Future()
+    threading.Thread(target=warm_twilio_import, daemon=True).start()
+    try:
+        await asyncio.Future()
+    finally:
+        retention_task.cancel()
 
 
 if __name__ == "__main__":
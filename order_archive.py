@@ -0,0 +1,128 @@
+"""Append-only archive for orders that have left the hot in-memory store.
+
+Orders are written as gzip-compressed JSON Lines, one segment per business day
+(orders-YYYY-MM-DD.jsonl.gz). Each archive run appends a new gzip member, which
+gzip readers treat as one continuous stream. index.json maps every segment to
+the lowest and highest order ID in it, so a lookup only decompresses the
+segments whose ID range can contain the order. phones.json keeps the most
+recent archived order IDs per normalized phone number, so the phone index can
+be rebuilt at startup without reading any segment.
+"""
+import gzip
+import json
+import os
+import threading
+
+from order_records import normalize_phone
+
+ORDER_ARCHIVE_DIR = os.getenv("ORDER_ARCHIVE_DIR", "order_archive")
+
+_INDEX_FILE = "index.json"
+_PHONES_FILE = "phones.json"
+ARCHIVED_IDS_PER_PHONE = 10
+_index_lock = threading.Lock()
+_index = None  # segment file name -> [min order id, max order id]
+_phones = None  # normalized phone -> most recent archived order IDs, oldest first
+
+
+def _read_json(name):
+    try:
+        with open(os.path.join(ORDER_ARCHIVE_DIR, name)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _write_json(name, data):
+    path = os.path.join(ORDER_ARCHIVE_DIR, name)
+    with open(path + ".tmp", "w") as f:
+        json.dump(data, f)
+    os.replace(path + ".tmp", path)
+
+
+def _load_index():
+    global _index
+    if _index is None:
+        _index = _read_json(_INDEX_FILE)
+    return _index
+
+
+def _load_phones():
+    global _phones
+    if _phones is None:
+        if os.path.exists(os.path.join(ORDER_ARCHIVE_DIR, _PHONES_FILE)) or not _load_index():
+            _phones = _read_json(_PHONES_FILE)
+        else:
+            # Archive written before phones.json existed: build it once from the segments
+            _phones = _scan_phones()
+            _write_json(_PHONES_FILE, _phones)
+    return _phones
+
+
+def _scan_phones():
+    phones = {}
+    for segment in sorted(_load_index()):
+        try:
+            with gzip.open(os.path.join(ORDER_ARCHIVE_DIR, segment), "rt") as f:
+                for line in f:
+                    order = json.loads(line)
+                    phone = normalize_phone(order["phone"])
+                    if phone:
+                        phones.setdefault(phone, []).append(order["id"])
+        except FileNotFoundError:
+            continue
+    return {phone: sorted(ids)[-ARCHIVED_IDS_PER_PHONE:] for phone, ids in phones.items()}
+
+
+def archive_orders(orders_by_day):
+    """Append orders to their day's segment. Takes {business day (date): [order dicts]}."""
+    with _index_lock:
+        index = _load_index()
+        phones = _load_phones()
+        os.makedirs(ORDER_ARCHIVE_DIR, exist_ok=True)
+        for day, orders in orders_by_day.items():
+            if not orders:
+                continue
+            segment = f"orders-{day.isoformat()}.jsonl.gz"
+            lines = "".join(json.dumps(order) + "\n" for order in orders)
+            with gzip.open(os.path.join(ORDER_ARCHIVE_DIR, segment), "at") as f:
+                f.write(lines)
+            ids = [order["id"] for order in orders]
+            low, high = index.get(segment, [min(ids), max(ids)])
+            index[segment] = [min(low, *ids), max(high, *ids)]
+            for order in orders:
+                phone = normalize_phone(order["phone"])
+                if phone:
+                    phone_ids = phones.setdefault(phone, [])
+                    phone_ids.append(order["id"])
+                    del phone_ids[:-ARCHIVED_IDS_PER_PHONE]
+        _write_json(_INDEX_FILE, index)
+        _write_json(_PHONES_FILE, phones)
+
+
+def find_archived_order(order_id):
+    """Return the archived order dict with this ID, or None."""
+    with _index_lock:
+        candidates = [segment for segment, (low, high) in _load_index().items() if low <= order_id <= high]
+    for segment in sorted(candidates, reverse=True):
+        try:
+            with gzip.open(os.path.join(ORDER_ARCHIVE_DIR, segment), "rt") as f:
+                for line in f:
+                    order = json.loads(line)
+                    if order["id"] == order_id:
+                        return order
+        except FileNotFoundError:
+            continue
+    return None
+
+
+def archived_ids_by_phone():
+    """Most recent archived order IDs per normalized phone number, oldest first."""
+    with _index_lock:
+        return {phone: list(ids) for phone, ids in _load_phones().items()}
+
+
+def highest_archived_id():
+    """Highest order ID in the archive (0 if empty), so new IDs never collide after a restart."""
+    with _index_lock:
+        return max((high for _, high in _load_index().values()), default=0)
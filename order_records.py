@@ -0,0 +1,113 @@
+"""Compact in-memory order records.
+
+Orders in ORDERS_DB are slotted objects instead of dicts: enum-like strings
+(status, order type, item type, item names, sizes) are interned so every
+order shares one copy, prices are integer cents, and toppings are a tuple of
+indices into the menu's topping list. Repeated toppings (a double portion) keep
+one index each, so a record always reproduces what was charged. Dicts in the original API shape are built only
+at the boundary with to_dict().
+"""
+import datetime
+import sys
+
+
+def to_cents(price):
+    """Convert a menu price in dollars to integer cents."""
+    return int(round(price * 100))
+
+
+def normalize_phone(phone):
+    """Reduce a phone number to its digits, dropping a leading US country code."""
+    digits = "".join(char for char in str(phone) if char.isdigit())
+    if len(digits) == 11 and digits.startswith("1"):
+        digits = digits[1:]
+    return digits
+
+
+def toppings_to_indices(toppings, topping_index):
+    """Pack topping keys into a tuple of indices using the menu's {topping key: index} map."""
+    return tuple(topping_index[topping] for topping in toppings)
+
+
+def indices_to_toppings(indices, topping_keys):
+    """Unpack topping indices into topping keys, in the order they were added."""
+    return [topping_keys[index] for index in indices]
+
+
+class OrderItem:
+    __slots__ = ("item_type", "name", "size", "toppings", "quantity", "unit_cents")
+
+    def __init__(self, item_type, name, quantity, unit_cents, size=None, toppings=()):
+        self.item_type = sys.intern(item_type)
+        self.name = sys.intern(name)
+        self.size = sys.intern(size) if size else None
+        self.toppings = toppings
+        self.quantity = quantity
+        self.unit_cents = unit_cents
+
+    @property
+    def total_cents(self):
+        return self.unit_cents * self.quantity
+
+    def to_dict(self, topping_keys):
+        item = {"type": self.item_type, "name": self.name}
+        if self.item_type == "pizza":
+            item["size"] = self.size
+            item["toppings"] = indices_to_toppings(self.toppings, topping_keys)
+        item["quantity"] = self.quantity
+        item["unit_price"] = self.unit_cents / 100
+        item["total_price"] = self.total_cents / 100
+        return item
+
+
+class Order:
+    __slots__ = ("id", "customer_name", "phone", "order_type", "address", "items", "total_cents",
+                 "status", "estimated_time", "created", "kitchen_status", "prep_started", "ready_at",
+                 "completed")
+
+    def __init__(self, order_id, customer_name, phone, order_type, address, items, estimated_time,
+                 kitchen_status="pending", status="confirmed", created=None):
+        self.id = order_id
+        self.customer_name = customer_name
+        self.phone = phone
+        self.order_type = sys.intern(order_type)
+        self.address = address
+        self.items = tuple(items)
+        self.total_cents = sum(item.total_cents for item in self.items)
+        self.status = sys.intern(status)
+        self.estimated_time = sys.intern(estimated_time)
+        self.created = created if created is not None else datetime.datetime.now().timestamp()
+        self.kitchen_status = sys.intern(kitchen_status)
+        # Epoch seconds of the latest move into each later kitchen status
+        self.prep_started = None
+        self.ready_at = None
+        self.completed = None
+
+    def set_kitchen_status(self, kitchen_status, now=None):
+        now = now if now is not None else datetime.datetime.now().timestamp()
+        self.kitchen_status = sys.intern(kitchen_status)
+        if kitchen_status == "in_preparation":
+            self.prep_started = now
+        elif kitchen_status == "ready":
+            self.ready_at = now
+        self.completed = now if kitchen_status == "completed" else None
+
+    def to_dict(self, topping_keys):
+        order = {
+            "id": self.id,
+            "customer_name": self.customer_name,
+            "phone": self.phone,
+            "order_type": self.order_type,
+            "address": self.address,
+            "items": [item.to_dict(topping_keys) for item in self.items],
+            "total_price": self.total_cents / 100,
+            "status": self.status,
+            "estimated_time": self.estimated_time,
+            "timestamp": datetime.datetime.fromtimestamp(self.created).isoformat(),
+            "kitchen_status": self.kitchen_status
+        }
+        for key, moment in (("in_preparation_at", self.prep_started), ("ready_at", self.ready_at),
+                            ("completed_at", self.completed)):
+            if moment is not None:
+                order[key] = datetime.datetime.fromtimestamp(moment).isoformat()
+        return order
@@ -1,30 +1,77 @@
+import datetime
+import os
 import threading
 
-# Simple in-memory storage
-ORDERS_DB = {"orders": {}, "next_id": 1}
+from order_archive import archive_orders, archived_ids_by_phone, find_archived_order, highest_archived_id
+from order_records import Order, OrderItem, normalize_phone, to_cents, toppings_to_indices
+
+# Simple in-memory storage (order ID -> order_records.Order)
+ORDERS_DB = {"orders": {}, "next_id": highest_archived_id() + 1}
+
+# Guards ORDERS_DB, which is touched by call handlers, the dashboard API and archival
+_orders_lock = threading.RLock()
+
+# Completed orders older than this move from ORDERS_DB to the on-disk archive
+ORDER_RETENTION_MINUTES = int(os.getenv("ORDER_RETENTION_MINUTES", "120"))
+
+# Daily counters reset at this local hour rather than midnight, so late-night orders count toward the evening
+BUSINESS_DAY_START_HOUR = int(os.getenv("BUSINESS_DAY_START_HOUR", "4"))
+
+
+def _business_day(moment):
+    """Business day a datetime belongs to."""
+    return (moment - datetime.timedelta(hours=BUSINESS_DAY_START_HOUR)).date()
+
+
+# Orders per bucket in the analytics time series
+ANALYTICS_BUCKET_MINUTES = int(os.getenv("ANALYTICS_BUCKET_MINUTES", "15"))
+
+
+def _new_daily_counters(business_day):
+    """Running aggregates for one business day, updated as orders are placed and progress."""
+    return {
+        "business_day": business_day,
+        "orders": 0,
+        "revenue_cents": 0,
+        "orders_per_bucket": {},  # "HH:MM" bucket start -> orders placed
+        "item_popularity": {},  # item name -> quantity ordered
+        "started_orders": 0,  # pending -> in_preparation transitions
+        "queue_seconds": 0.0,
+        "completed_orders": 0,
+        "completion_seconds": 0.0  # placed -> completed
+    }
+
+
+DAILY_COUNTERS = _new_daily_counters(_business_day(datetime.datetime.now()))
+
+# Normalized phone number -> IDs of that caller's most recent orders, oldest first.
+# Starts from the archive's phone index so returning callers keep their history across restarts.
+PHONE_INDEX_MAX_ORDERS = 10
+PHONE_INDEX = {phone: ids[-PHONE_INDEX_MAX_ORDERS:] for phone, ids in archived_ids_by_phone().items()}
+CUSTOMER_ORDERS_LIMIT = 3
+
+# Orders currently in ORDERS_DB by kitchen status
+STATUS_COUNTS = {"pending": 0, "in_preparation": 0, "ready": 0, "completed": 0}
 
 # Call queue management
 CALL_QUEUE = {
     "active_calls": 0,
-    "customers_waiting": 0
+    "customers_waiting": 0,
+    "estimated_wait_seconds": 0
 }
 
 # Add some test data for demonstration
 def _add_test_data():
-    import datetime
-    
     # Sample orders for testing
     test_orders = [
         {
             "customer_name": "John Smith",
             "phone": "555-0123",
             "order_type": "pickup",
-            "address": "",
+            "address": None,
             "items": [
-                {"type": "pizza", "name": "Pepperoni Classic (Large)", "size": "large", "toppings": ["pepperoni"], "quantity": 1}
+                {"type": "pizza", "name": "pepperoni", "size": "large", "toppings": ["pepperoni"], "quantity": 1}
             ],
-            "total_price": 18.99,
-            "estimated_time": "25-35 minutes",
             "kitchen_status": "pending"
         },
         {
@@ -33,35 +80,30 @@ def _add_test_data():
             "order_type": "delivery",
             "address": "123 Main St, Pizza City",
             "items": [
-                {"type": "pizza", "name": "Supreme (Medium)", "size": "medium", "toppings": ["pepperoni", "sausage", "bell_peppers"], "quantity": 2},
-                {"type": "side", "name": "Garlic Bread", "quantity": 1}
+                {"type": "pizza", "name": "supreme", "size": "medium", "toppings": ["pepperoni", "sausage", "bell_peppers"], "quantity": 2},
+                {"type": "side", "name": "garlic_bread", "quantity": 1}
             ],
-            "total_price": 38.97,
-            "estimated_time": "35-45 minutes",
             "kitchen_status": "in_preparation"
         }
     ]
     
-    for i, order_data in enumerate(test_orders, 1):
-        order = {
-            "id": i,
-            "customer_name": order_data["customer_name"],
-            "phone": order_data["phone"],
-            "order_type": order_data["order_type"],
-            "address": order_data["address"],
-            "items": order_data["items"],
-            "total_price": order_data["total_price"],
-            "status": "confirmed",
-            "estimated_time": order_data["estimated_time"],
-            "timestamp": datetime.datetime.now().isoformat(),
-            "kitchen_status": order_data["kitchen_status"]
-        }
+    first_id = ORDERS_DB["next_id"]
+    for i, order_data in enumerate(test_orders, first_id):
+        order = Order(
+            i,
+            order_data["customer_name"],
+            order_data["phone"],
+            order_data["order_type"],
+            order_data["address"],
+            [_process_order_item(item)["item"] for item in order_data["items"]],
+            _estimated_time(order_data["order_type"]),
+            kitchen_status=order_data["kitchen_status"]
+        )
         ORDERS_DB["orders"][i] = order
+        _index_phone(order)
+        _count_daily_order(order)
     
-    ORDERS_DB["next_id"] = len(test_orders) + 1
-
-# Initialize test data
-_add_test_data()
+    ORDERS_DB["next_id"] = first_id + len(test_orders)
 
 # Zavier's Pizza Menu
 PIZZA_MENU = {
@@ -144,6 +186,11 @@ PIZZA_MENU = {
 }
 
 
+# Bit position of every topping in an order item's topping mask, in menu order
+TOPPING_KEYS = tuple(key for category in PIZZA_MENU["toppings"].values() for key in category)
+TOPPING_INDEX = {key: index for index, key in enumerate(TOPPING_KEYS)}
+
+
 def get_menu():
     """Get the complete pizza menu."""
     # Create simple, conversational menu overview
@@ -177,7 +224,6 @@ def place_pizza_order(customer_name, phone, order_type, address, items):
     
     # Process and validate items
     processed_items = []
-    total_price = 0.0
     
     for item in items:
         try:
@@ -185,50 +231,46 @@ def place_pizza_order(customer_name, phone, order_type, address, items):
             if "error" in item_result:
                 return item_result
             processed_items.append(item_result["item"])
-            total_price += item_result["price"]
         except Exception as e:
             return {"error": f"Error processing item: {str(e)}"}
     
     # Create order
-    order_id = ORDERS_DB["next_id"]
-    ORDERS_DB["next_id"] += 1
-    
-    import datetime
-    
-    order = {
-        "id": order_id,
-        "customer_name": customer_name,
-        "phone": phone,
-        "order_type": order_type,
-        "address": address if order_type == "delivery" else None,
-        "items": processed_items,
-        "total_price": round(total_price, 2),
-        "status": "confirmed",
-        "estimated_time": "25-35 minutes" if order_type == "pickup" else "35-45 minutes",
-        "timestamp": datetime.datetime.now().isoformat(),
-        "kitchen_status": "pending"  # pending, in_preparation, ready, completed
-    }
-    
-    ORDERS_DB["orders"][order_id] = order
+    with _orders_lock:
+        order_id = ORDERS_DB["next_id"]
+        ORDERS_DB["next_id"] += 1
+    
+    order = Order(
+        order_id,
+        customer_name,
+        phone,
+        order_type,
+        address if order_type == "delivery" else None,
+        processed_items,
+        _estimated_time(order_type),
+        kitchen_status="pending"  # pending, in_preparation, ready, completed
+    )
+    
+    with _orders_lock:
+        ORDERS_DB["orders"][order_id] = order
+        _index_phone(order)
+        _count_daily_order(order)
     
     # Create natural speech confirmation message
     item_summary = []
     for item in processed_items[:2]:  # Limit to first 2 items for brevity
-        if item["type"] == "pizza":
-            item_summary.append(f"{item['quantity']} {item['name']}")
-        else:
-            item_summary.append(f"{item['quantity']} {item['name']}")
+        item_summary.append(f"{item.quantity} {item.name}")
     
     items_text = ", ".join(item_summary)
     if len(processed_items) > 2:
         items_text += f" and {len(processed_items) - 2} more item{'s' if len(processed_items) - 2 > 1 else ''}"
     
-    speech_message = f"Perfect! Order number {order_id} is confirmed for {customer_name}... You ordered {items_text}, total is ${order['total_price']:.2f}"
+    total_price = order.total_cents / 100
+    speech_message = f"Perfect! Order number {order_id} is confirmed for {customer_name}... You ordered {items_text}, total is ${total_price:.2f}"
     
     if order_type == "delivery":
-        speech_message += f" for delivery to {address}. It'll be ready in {order['estimated_time']}"
+        speech_message += f" for delivery to {address}. It'll be ready in {order.estimated_time}"
     else:
-        speech_message += f" for pickup. It'll be ready in {order['estimated_time']}"
+        speech_message += f" for pickup. It'll be ready in {order.estimated_time}"
     
     speech_message += ". Thank you for choosing Zavier's Pizza!"
     
@@ -236,13 +278,18 @@ def place_pizza_order(customer_name, phone, order_type, address, items):
         "order_id": order_id,
         "message": speech_message,
         "order_type": order_type,
-        "total_price": order["total_price"],
-        "estimated_time": order["estimated_time"],
+        "total_price": total_price,
+        "estimated_time": order.estimated_time,
         "items_count": len(processed_items),
         "speech_optimized": True
     }
 
 
+def _estimated_time(order_type):
+    """Quoted ready time for an order type."""
+    return "25-35 minutes" if order_type == "pickup" else "35-45 minutes"
+
+
 def _process_order_item(item):
     """Process and validate a single order item."""
     item_type = item.get("type")
@@ -273,7 +320,7 @@ def _process_pizza_item(item, quantity):
         return {"error": f"Invalid size '{size}'. Available sizes: {', '.join(available_sizes)}"}
     
     base_price = PIZZA_MENU["sizes"][size]["base_price"]
-    item_price = base_price
+    item_cents = to_cents(base_price)
     
     # Handle specialty pizza or build-your-own
     if pizza_name in PIZZA_MENU["specialty_pizzas"]:
@@ -283,12 +330,12 @@ def _process_pizza_item(item, quantity):
         
         # Add any extra toppings
         for topping in toppings:
-            if topping not in final_toppings:
-                topping_price = _get_topping_price(topping)
-                if topping_price is None:
-                    return {"error": f"Invalid topping: {topping}"}
-                item_price += topping_price
-                final_toppings.append(topping)
+            topping_key = _get_topping_key(topping)
+            if topping_key is None:
+                return {"error": f"Invalid topping: {topping}"}
+            if topping_key not in final_toppings:
+                item_cents += to_cents(_get_topping_price(topping_key))
+                final_toppings.append(topping_key)
     
     elif pizza_name == "build_your_own" or pizza_name == "custom":
         display_name = f"Build Your Own ({PIZZA_MENU['sizes'][size]['name']})"
@@ -296,28 +343,24 @@ def _process_pizza_item(item, quantity):
         
         # Add toppings and calculate price
         for topping in toppings:
-            topping_price = _get_topping_price(topping)
-            if topping_price is None:
+            topping_key = _get_topping_key(topping)
+            if topping_key is None:
                 return {"error": f"Invalid topping: {topping}"}
-            item_price += topping_price
-            final_toppings.append(topping)
+            item_cents += to_cents(_get_topping_price(topping_key))
+            final_toppings.append(topping_key)
     
     else:
         return {"error": f"Invalid pizza type: {pizza_name}"}
     
-    total_price = item_price * quantity
-    
     return {
-        "item": {
-            "type": "pizza",
-            "name": display_name,
-            "size": size,
-            "toppings": final_toppings,
-            "quantity": quantity,
-            "unit_price": round(item_price, 2),
-            "total_price": round(total_price, 2)
-        },
-        "price": total_price
+        "item": OrderItem(
+            "pizza",
+            display_name,
+            quantity,
+            item_cents,
+            size=size,
+            toppings=toppings_to_indices(final_toppings, TOPPING_INDEX)
+        )
     }
 
 
@@ -330,18 +373,8 @@ def _process_side_item(item, quantity):
         return {"error": f"Invalid side: {side_name}. Available sides: {', '.join(available_sides)}"}
     
     side = PIZZA_MENU["sides"][side_name]
-    total_price = side["price"] * quantity
     
-    return {
-        "item": {
-            "type": "side",
-            "name": side["name"],
-            "quantity": quantity,
-            "unit_price": side["price"],
-            "total_price": round(total_price, 2)
-        },
-        "price": total_price
-    }
+    return {"item": OrderItem("side", side["name"], quantity, to_cents(side["price"]))}
 
 
 def _process_drink_item(item, quantity):
@@ -353,18 +386,8 @@ def _process_drink_item(item, quantity):
         return {"error": f"Invalid drink: {drink_name}. Available drinks: {', '.join(available_drinks)}"}
     
     drink = PIZZA_MENU["drinks"][drink_name]
-    total_price = drink["price"] * quantity
     
-    return {
-        "item": {
-            "type": "drink",
-            "name": drink["name"],
-            "quantity": quantity,
-            "unit_price": drink["price"],
-            "total_price": round(total_price, 2)
-        },
-        "price": total_price
-    }
+    return {"item": OrderItem("drink", drink["name"], quantity, to_cents(drink["price"]))}
 
 
 def _normalize_pizza_name(pizza_name):
@@ -463,25 +486,46 @@ def _normalize_topping_name(topping_name):
     return normalized
 
 
-def _get_topping_price(topping_name):
-    """Get the price for a topping."""
+def _get_topping_key(topping_name):
+    """Get the menu key for a topping name, or None if it isn't on the menu."""
     # Normalize the topping name first
     normalized_name = _normalize_topping_name(topping_name)
     
     # Search through all topping categories
     for category in PIZZA_MENU["toppings"].values():
         if normalized_name in category:
-            return category[normalized_name]["price"]
+            return normalized_name
     
     # Also check if the original name matches any display names
     for category in PIZZA_MENU["toppings"].values():
         for key, topping_info in category.items():
             if topping_info["name"].lower() == topping_name.lower():
-                return topping_info["price"]
+                return key
     
     return None
 
 
+def _get_topping_price(topping_name):
+    """Get the price for a topping."""
+    topping_key = _get_topping_key(topping_name)
+    if topping_key is None:
+        return None
+    
+    for category in PIZZA_MENU["toppings"].values():
+        if topping_key in category:
+            return category[topping_key]["price"]
+
+
+def _find_order_dict(order_id):
+    """An order as a dict, from memory or the archive, or None if it doesn't exist."""
+    with _orders_lock:
+        record = ORDERS_DB["orders"].get(order_id)
+        if record:
+            return record.to_dict(TOPPING_KEYS)
+    # Older completed orders live in the archive
+    return find_archived_order(order_id)
+
+
 def lookup_order(order_id):
     """Look up a pizza order."""
     try:
@@ -489,7 +533,7 @@ def lookup_order(order_id):
     except ValueError:
         return {"error": "Order ID must be a number"}
     
-    order = ORDERS_DB["orders"].get(order_id_int)
+    order = _find_order_dict(order_id_int)
     if order:
         # Create natural speech order summary
         item_summary = []
@@ -528,21 +572,136 @@ def lookup_order(order_id):
     return {"error": f"Sorry, I couldn't find order number {order_id}. Could you please double-check that number?"}
 
 
+def _index_phone(order):
+    """Add an order to the phone index. Call with _orders_lock held."""
+    phone = normalize_phone(order.phone)
+    if not phone:
+        return
+    order_ids = PHONE_INDEX.setdefault(phone, [])
+    order_ids.append(order.id)
+    if len(order_ids) > PHONE_INDEX_MAX_ORDERS:
+        del order_ids[0]
+
+
+def _recent_orders_for_phone(phone, limit):
+    """Most recent orders for a phone number as dicts, newest first."""
+    with _orders_lock:
+        order_ids = list(reversed(PHONE_INDEX.get(normalize_phone(phone), [])))
+    
+    orders = []
+    for order_id in order_ids:
+        order = _find_order_dict(order_id)
+        if order:
+            orders.append(order)
+        if len(orders) >= limit:
+            break
+    return orders
+
+
+def _describe_items(items):
+    """Short spoken summary of an order's items."""
+    item_summary = [f"{item['quantity']} {item['name']}" for item in items[:2]]  # Limit to first 2 items for brevity
+    items_text = ", ".join(item_summary)
+    if len(items) > 2:
+        items_text += f" and {len(items) - 2} more item{'s' if len(items) - 2 > 1 else ''}"
+    return items_text
+
+
+def get_customer_orders(phone, limit=None):
+    """Look up a caller's recent orders by phone number.
+    
+    Anyone can say a phone number, so delivery addresses are left out of the result.
+    """
+    if not normalize_phone(phone):
+        return {"error": "Please provide a phone number to look up"}
+    try:
+        limit = max(1, int(limit))
+    except (TypeError, ValueError):
+        limit = CUSTOMER_ORDERS_LIMIT
+    
+    orders = _recent_orders_for_phone(phone, limit)
+    if not orders:
+        return {"error": "I couldn't find any previous orders for that phone number."}
+    
+    last = orders[0]
+    speech_message = f"Welcome back, {last['customer_name']}! Your last order, number {last['id']}, was {_describe_items(last['items'])}, total ${last['total_price']:.2f}"
+    speech_message += " for delivery." if last["order_type"] == "delivery" else " for pickup."
+    speech_message += " Would you like the same again?"
+    
+    return {
+        "customer_name": last["customer_name"],
+        "orders": [
+            {
+                "order_id": order["id"],
+                "order_type": order["order_type"],
+                "items": order["items"],
+                "total_price": order["total_price"],
+                "timestamp": order["timestamp"],
+                "kitchen_status": order["kitchen_status"]
+            }
+            for order in orders
+        ],
+        "message": speech_message,
+        "speech_optimized": True
+    }
+
+
+def _item_request(item):
+    """Turn a stored order item back into the item format place_pizza_order takes."""
+    request = {"type": item["type"], "name": item["name"], "quantity": item["quantity"]}
+    if item["type"] == "pizza":
+        # Stored names carry the size, e.g. "Supreme (Medium (12\"))"
+        request["name"] = item["name"].split(" (")[0]
+        request["size"] = item["size"]
+        request["toppings"] = item["toppings"]
+    return request
+
+
+def reorder_last_order(phone, order_type=None, address=None):
+    """Place a repeat of the caller's most recent order, re-priced at today's menu."""
+    orders = _recent_orders_for_phone(phone, 1)
+    if not orders:
+        return {"error": "I couldn't find a previous order for that phone number."}
+    
+    last = orders[0]
+    order_type = order_type or last["order_type"]
+    address_on_file = order_type == "delivery" and not address
+    if address_on_file:
+        address = last.get("address")
+    
+    result = place_pizza_order(
+        last["customer_name"],
+        last["phone"],
+        order_type,
+        address or "",
+        [_item_request(item) for item in last["items"]]
+    )
+    if "order_id" in result:
+        result["repeated_order_id"] = last["id"]
+        if address_on_file:
+            # Don't read a stored address back to whoever knows the phone number
+            result["message"] = result["message"].replace(f" for delivery to {address}.", " for delivery to the address on file.")
+    return result
+
+
 def get_dashboard_data():
     """Get current dashboard data including queue status and active orders."""
     # Get orders that need preparation
     active_orders = []
-    for order in ORDERS_DB["orders"].values():
-        if order["kitchen_status"] in ["pending", "in_preparation"]:
-            active_orders.append(order)
-    
-    # Sort by timestamp (oldest first)
-    active_orders.sort(key=lambda x: x["timestamp"])
+    with _orders_lock:
+        for order in ORDERS_DB["orders"].values():
+            if order.kitchen_status in ["pending", "in_preparation"]:
+                active_orders.append(order)
+        _roll_daily_counters()
+        
+        # Sort by timestamp (oldest first)
+        active_orders.sort(key=lambda x: x.created)
+        active_orders = [order.to_dict(TOPPING_KEYS) for order in active_orders]
     
     return {
         "call_queue": CALL_QUEUE.copy(),
         "active_orders": active_orders,
-        "total_orders_today": len(ORDERS_DB["orders"])
+        "total_orders_today": DAILY_COUNTERS["orders"]
     }
 
 
@@ -550,17 +709,23 @@ def update_order_status(order_id, kitchen_status):
     """Update the kitchen status of an order."""
     try:
         order_id_int = int(order_id)
-    except ValueError:
+    except (TypeError, ValueError):
         return {"error": "Order ID must be a number"}
     
-    if order_id_int not in ORDERS_DB["orders"]:
-        return {"error": f"Order {order_id} not found"}
-    
     valid_statuses = ["pending", "in_preparation", "ready", "completed"]
     if kitchen_status not in valid_statuses:
         return {"error": f"Invalid status. Must be one of: {', '.join(valid_statuses)}"}
     
-    ORDERS_DB["orders"][order_id_int]["kitchen_status"] = kitchen_status
+    with _orders_lock:
+        order = ORDERS_DB["orders"].get(order_id_int)
+        if order is None:
+            return {"error": f"Order {order_id} not found"}
+        
+        previous_status = order.kitchen_status
+        if previous_status != kitchen_status:
+            previous_completed = order.completed
+            order.set_kitchen_status(kitchen_status)
+            _count_status_change(order, previous_status, previous_completed)
     
     return {
         "success": True,
@@ -570,10 +735,140 @@ def update_order_status(order_id, kitchen_status):
     }
 
 
+def update_order_statuses(updates):
+    """Apply several kitchen status updates in one locked operation.
+    
+    Each update is {"order_id": ..., "kitchen_status": ...}. Updates are applied
+    independently, so one bad ID doesn't block the rest; the result for each is
+    reported in request order.
+    """
+    results = []
+    with _orders_lock:
+        for update in updates:
+            result = update_order_status(update.get("order_id"), update.get("kitchen_status"))
+            results.append({"order_id": update.get("order_id"), **result})
+    
+    updated = sum(1 for result in results if result.get("success"))
+    return {
+        "success": updated == len(results),
+        "updated": updated,
+        "failed": len(results) - updated,
+        "results": results
+    }
+
+
+def _roll_daily_counters(now=None):
+    """Reset daily counters when a new business day starts. Call with _orders_lock held."""
+    today = _business_day(now or datetime.datetime.now())
+    if today != DAILY_COUNTERS["business_day"]:
+        DAILY_COUNTERS.clear()
+        DAILY_COUNTERS.update(_new_daily_counters(today))
+
+
+def _count_daily_order(order):
+    """Count a new order toward today's totals. Call with _orders_lock held."""
+    placed = datetime.datetime.fromtimestamp(order.created)
+    _roll_daily_counters(placed)
+    DAILY_COUNTERS["orders"] += 1
+    DAILY_COUNTERS["revenue_cents"] += order.total_cents
+    
+    bucket_minute = placed.minute - placed.minute % ANALYTICS_BUCKET_MINUTES
+    bucket = f"{placed.hour:02d}:{bucket_minute:02d}"
+    buckets = DAILY_COUNTERS["orders_per_bucket"]
+    buckets[bucket] = buckets.get(bucket, 0) + 1
+    
+    popularity = DAILY_COUNTERS["item_popularity"]
+    for item in order.items:
+        popularity[item.name] = popularity.get(item.name, 0) + item.quantity
+    
+    STATUS_COUNTS[order.kitchen_status] += 1
+
+
+def _count_status_change(order, previous_status, previous_completed=None):
+    """Fold a kitchen status transition into the aggregates. Call with _orders_lock held."""
+    _roll_daily_counters()
+    STATUS_COUNTS[previous_status] -= 1
+    STATUS_COUNTS[order.kitchen_status] += 1
+    
+    if previous_status == "completed" and previous_completed is not None:
+        # Reopened: take back its completion if today's counters include it
+        completed_on = _business_day(datetime.datetime.fromtimestamp(previous_completed))
+        if completed_on == DAILY_COUNTERS["business_day"]:
+            DAILY_COUNTERS["completed_orders"] -= 1
+            DAILY_COUNTERS["completion_seconds"] -= previous_completed - order.created
+    
+    if order.kitchen_status == "in_preparation" and previous_status == "pending":
+        DAILY_COUNTERS["started_orders"] += 1
+        DAILY_COUNTERS["queue_seconds"] += order.prep_started - order.created
+    elif order.kitchen_status == "completed":
+        DAILY_COUNTERS["completed_orders"] += 1
+        DAILY_COUNTERS["completion_seconds"] += order.completed - order.created
+
+
+def get_analytics():
+    """Get today's kitchen analytics from the running aggregates (no scan of ORDERS_DB)."""
+    with _orders_lock:
+        _roll_daily_counters()
+        counters = DAILY_COUNTERS
+        started = counters["started_orders"]
+        completed = counters["completed_orders"]
+        popular_items = sorted(counters["item_popularity"].items(), key=lambda entry: entry[1], reverse=True)
+        
+        return {
+            "business_day": counters["business_day"].isoformat(),
+            "total_orders": counters["orders"],
+            "revenue": counters["revenue_cents"] / 100,
+            "average_order_value": round(counters["revenue_cents"] / counters["orders"] / 100, 2) if counters["orders"] else 0,
+            "bucket_minutes": ANALYTICS_BUCKET_MINUTES,
+            "orders_per_bucket": [
+                {"bucket": bucket, "orders": count}
+                for bucket, count in sorted(counters["orders_per_bucket"].items())
+            ],
+            "item_popularity": [{"name": name, "quantity": quantity} for name, quantity in popular_items],
+            "kitchen_status_counts": STATUS_COUNTS.copy(),
+            "average_queue_minutes": round(counters["queue_seconds"] / started / 60, 1) if started else None,
+            "average_completion_minutes": round(counters["completion_seconds"] / completed / 60, 1) if completed else None,
+            "completed_orders": completed
+        }
+
+
+def archive_completed_orders(now=None):
+    """Move completed orders past the retention window from ORDERS_DB to the archive."""
+    now = now or datetime.datetime.now()
+    cutoff = (now - datetime.timedelta(minutes=ORDER_RETENTION_MINUTES)).timestamp()
+    
+    with _orders_lock:
+        expired = [
+            order.to_dict(TOPPING_KEYS) for order in ORDERS_DB["orders"].values()
+            if order.kitchen_status == "completed" and order.completed < cutoff
+        ]
+    if not expired:
+        return {"archived": 0}
+    
+    # Write before removing so the order can always be found in one place or the other
+    orders_by_day = {}
+    for order in expired:
+        day = _business_day(datetime.datetime.fromisoformat(order["timestamp"]))
+        orders_by_day.setdefault(day, []).append(order)
+    archive_orders(orders_by_day)
+    
+    archived = 0
+    with _orders_lock:
+        for order in expired:
+            current = ORDERS_DB["orders"].get(order["id"])
+            # Skip orders a kitchen update reopened while we were writing
+            if current is not None and current.kitchen_status == "completed":
+                del ORDERS_DB["orders"][order["id"]]
+                STATUS_COUNTS["completed"] -= 1
+                archived += 1
+    
+    return {"archived": archived, "remaining": len(ORDERS_DB["orders"])}
+
+
 # Thread lock for CALL_QUEUE updates
 _call_queue_lock = threading.Lock()
 
-def update_call_queue(active_calls=None, customers_waiting=None):
+def update_call_queue(active_calls=None, customers_waiting=None, estimated_wait_seconds=None):
     """Update call queue status (thread-safe)."""
     global CALL_QUEUE
     
@@ -584,15 +879,27 @@ def update_call_queue(active_calls=None, customers_waiting=None):
         if customers_waiting is not None:
             CALL_QUEUE["customers_waiting"] = max(0, customers_waiting)
         
+        if estimated_wait_seconds is not None:
+            CALL_QUEUE["estimated_wait_seconds"] = max(0, int(estimated_wait_seconds))
+        
         return {"success": True, "queue_status": CALL_QUEUE.copy()}
 
 
+# Seed demo orders only when explicitly asked for, never by default in production
+if os.getenv("SEED_DEMO_ORDERS", "false").lower() == "true":
+    _add_test_data()
+
+
 # Function mapping dictionary
 FUNCTION_MAP = {
     'get_menu': get_menu,
     'place_pizza_order': place_pizza_order,
     'lookup_order': lookup_order,
+    'get_customer_orders': get_customer_orders,
+    'reorder_last_order': reorder_last_order,
     'get_dashboard_data': get_dashboard_data,
+    'get_analytics': get_analytics,
     'update_order_status': update_order_status,
+    'update_order_statuses': update_order_statuses,
     'update_call_queue': update_call_queue
 }
\ No newline at end of file
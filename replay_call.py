@@ -0,0 +1,167 @@
+"""Replay a recorded call through the real twilio_handler.
+
+Feeds the messages the handler originally received (from Twilio and from the
+Deepgram agent) into local stand-in sockets, either on the recorded schedule
+or as fast as the handler consumes them, and reports how long the handler
+spent on each message before asking for the next one. Recording, the audio
+tap and the Twilio REST hangup are switched off while replaying, so a replay
+never writes files or touches a live call.
+
+    python replay_call.py recordings/CA123.rec            # recorded speed
+    python replay_call.py recordings/CA123.rec --fast     # as fast as possible
+"""
+import argparse
+import asyncio
+import contextlib
+import statistics
+import time
+
+import main
+from call_recorder import CHANNEL_DEEPGRAM, CHANNEL_NAMES, CHANNEL_TWILIO, KIND_TEXT, RECEIVED, SENT, read_recording
+
+# How long to let the handler wind down after the last recorded message
+DRAIN_SECONDS = 2.0
+
+
+class ReplaySocket:
+    """Stand-in websocket fed from a recording, timing how long each message takes to process."""
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.inbox = asyncio.Queue()
+        self.sent = []
+        self.closed = False
+        self.in_flight = None  # (kind, delivered at) of the message being processed
+        self.latencies = {}  # kind -> list of seconds
+        self.idle = asyncio.Event()
+        self.idle.set()
+
+    def feed(self, kind, message):
+        self.idle.clear()
+        self.inbox.put_nowait((kind, message))
+
+    def finish(self):
+        self.inbox.put_nowait(None)
+
+    def _settle(self):
+        """The handler came back for another message, so the previous one is done."""
+        if self.in_flight:
+            kind, delivered = self.in_flight
+            self.latencies.setdefault(kind, []).append(time.perf_counter() - delivered)
+            self.in_flight = None
+        if self.inbox.empty():
+            self.idle.set()
+
+    async def recv(self):
+        self._settle()
+        item = await self.inbox.get()
+        if item is None:
+            self.closed = True
+            self.idle.set()
+            raise ConnectionError("replay finished")
+        kind, message = item
+        self.in_flight = (kind, time.perf_counter())
+        return message
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self.recv()
+        except ConnectionError:
+            raise StopAsyncIteration
+
+    async def send(self, message):
+        self.sent.append(message)
+
+    async def close(self):
+        self.closed = True
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+def skip_hangup(call_sid):
+    print(f"Replay: not hanging up {call_sid}")
+    return True
+
+
+@contextlib.contextmanager
+def offline_handler():
+    """Run twilio_handler without recording, tapping or hanging up real calls."""
+    saved = {name: getattr(main, name) for name in ("open_recorder", "open_tap", "end_twilio_call")}
+    main.open_recorder = lambda: None
+    main.open_tap = lambda call_sid: None
+    main.end_twilio_call = skip_hangup
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(main, name, value)
+
+
+async def replay(path, fast=False):
+    records = read_recording(path)
+    with offline_handler():
+        await _replay(path, records, fast)
+
+
+async def _replay(path, records, fast):
+    sockets = {CHANNEL_TWILIO: ReplaySocket(CHANNEL_TWILIO), CHANNEL_DEEPGRAM: ReplaySocket(CHANNEL_DEEPGRAM)}
+    handler = asyncio.ensure_future(main.twilio_handler(sockets[CHANNEL_TWILIO], connect=lambda: sockets[CHANNEL_DEEPGRAM]))
+
+    started = time.perf_counter()
+    for channel, direction, kind, elapsed, message in records:
+        if direction != RECEIVED:
+            continue
+        socket = sockets[channel]
+        if fast:
+            # Wait until the handler has finished the previous message on this socket
+            try:
+                await asyncio.wait_for(socket.idle.wait(), 1.0)
+            except asyncio.TimeoutError:
+                pass
+        else:
+            delay = started + elapsed - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        socket.feed(kind, message)
+    replay_seconds = time.perf_counter() - started
+
+    for socket in sockets.values():
+        socket.finish()
+    try:
+        await asyncio.wait_for(handler, DRAIN_SECONDS)
+    except asyncio.TimeoutError:
+        handler.cancel()
+        print(f"Handler still running {DRAIN_SECONDS}s after the recording ended; cancelled it")
+
+    recorded_sent = {channel: 0 for channel in sockets}
+    for channel, direction, *_ in records:
+        if direction == SENT:
+            recorded_sent[channel] += 1
+
+    print(f"Replayed {path} in {replay_seconds:.2f}s ({'fast' if fast else 'recorded speed'}, "
+          f"recording spans {records[-1][3] if records else 0:.2f}s)")
+    print(f"{'messages in':<22}{'count':>7}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}")
+    for channel, socket in sockets.items():
+        for kind, latencies in sorted(socket.latencies.items()):
+            latencies_ms = sorted(latency * 1000 for latency in latencies)
+            label = f"{CHANNEL_NAMES[channel]} {'text' if kind == KIND_TEXT else 'binary'}"
+            p95 = latencies_ms[min(len(latencies_ms) - 1, int(len(latencies_ms) * 0.95))]
+            print(f"{label:<22}{len(latencies_ms):>7}{statistics.median(latencies_ms):>9.3f}"
+                  f"{p95:>9.3f}{latencies_ms[-1]:>9.3f}")
+    for channel, socket in sockets.items():
+        print(f"Sent to {CHANNEL_NAMES[channel]}: {len(socket.sent)} messages (recorded: {recorded_sent[channel]})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a recorded call through twilio_handler")
+    parser.add_argument("recording", help="Path to a .rec file from CALL_RECORDING_DIR")
+    parser.add_argument("--fast", action="store_true", help="Feed messages as fast as the handler takes them")
+    args = parser.parse_args()
+    asyncio.run(replay(args.recording, fast=args.fast))
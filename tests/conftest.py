@@ -0,0 +1,8 @@
+import os
+import tempfile
+
+# Keep tests away from the real order archive, and switch off recording and the
+# audio tap (empty values also stop load_dotenv from filling them in from .env)
+os.environ["ORDER_ARCHIVE_DIR"] = tempfile.mkdtemp(prefix="order_archive_")
+os.environ["CALL_RECORDING_DIR"] = ""
+os.environ["AUDIO_TAP_DIR"] = ""
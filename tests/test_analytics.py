@@ -0,0 +1,23 @@
+import pizza_functions
+from pizza_functions import DAILY_COUNTERS, ORDERS_DB, get_analytics, update_order_status
+
+
+def test_reopened_order_counts_one_completion():
+    order = pizza_functions.place_pizza_order("Ann", "555-0142", "pickup", "",
+                                              [{"type": "drink", "name": "water", "quantity": 1}])
+    order_id = order["order_id"]
+    completed_before = get_analytics()["completed_orders"]
+    try:
+        for status in ("completed", "ready", "completed"):
+            assert update_order_status(order_id, status)["success"]
+        record = ORDERS_DB["orders"][order_id]
+        analytics = get_analytics()
+        assert analytics["completed_orders"] == completed_before + 1
+        assert analytics["kitchen_status_counts"]["completed"] >= 1
+
+        update_order_status(order_id, "ready")
+        assert get_analytics()["completed_orders"] == completed_before
+        assert DAILY_COUNTERS["completion_seconds"] >= 0
+        assert record.completed is None
+    finally:
+        ORDERS_DB["orders"].pop(order_id, None)
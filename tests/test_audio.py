@@ -0,0 +1,117 @@
+import math
+
+from audio import FRAME_BYTES, MULAW_SILENCE, InboundChunker, JitterBuffer, SilenceSuppressor, linear_to_mulaw, silence
+
+SILENT = bytes([MULAW_SILENCE]) * 2
+TONE = bytes(linear_to_mulaw(int(3000 * math.sin(2 * math.pi * 440 * n / 8000))) for n in range(FRAME_BYTES))
+QUIET = silence(20)
+
+
+def frame(number):
+    return bytes([number]) * 2
+
+
+def run(numbers, **options):
+    jitter = JitterBuffer(**options)
+    released = [jitter.push(number, frame(number)) for number in numbers]
+    return released, jitter
+
+
+def test_in_order_frames_pass_straight_through():
+    released, jitter = run([1, 2, 3])
+    assert released == [[frame(1)], [frame(2)], [frame(3)]]
+    assert jitter.stats == {"late_frames": 0, "lost_frames": 0, "duplicate_frames": 0}
+
+
+def test_swapped_frames_are_reordered_with_one_frame_of_delay():
+    released, jitter = run([1, 3, 2, 4])
+    assert released == [[frame(1)], [], [frame(2), frame(3)], [frame(4)]]
+    assert jitter.lost == 0
+
+
+def test_missing_frame_is_filled_with_silence_and_counted_lost():
+    released, jitter = run([1, 3, 4, 5])
+    assert released[2] == [SILENT, frame(3), frame(4)]
+    assert (jitter.lost, jitter.late) == (1, 0)
+
+
+def test_frame_arriving_after_its_gap_was_filled_is_late_not_lost():
+    released, jitter = run([1, 3, 4, 2, 2])
+    assert released[3:] == [[], []]
+    assert (jitter.lost, jitter.late, jitter.duplicates) == (0, 1, 1)
+
+
+def test_duplicates_are_counted_separately():
+    released, jitter = run([1, 2, 2, 4, 4])
+    assert (jitter.late, jitter.duplicates) == (0, 2)
+
+
+def test_long_gap_is_skipped_not_filled():
+    released, jitter = run([1, 2, 200], max_gap_frames=50)
+    assert released[2] == [frame(200)]
+    assert jitter.lost == 197
+
+
+def test_flush_releases_held_frames_at_end_of_stream():
+    jitter = JitterBuffer()
+    jitter.push(1, frame(1))
+    assert jitter.push(3, frame(3)) == []
+    assert jitter.flush() == [SILENT, frame(3)]
+    assert jitter.lost == 1
+
+
+def suppress(frames, **options):
+    suppressor = SilenceSuppressor(**options)
+    return [suppressor.push(frame) for frame in frames], suppressor
+
+
+def test_speech_and_hangover_silence_pass_through():
+    out, suppressor = suppress([TONE] * 5 + [QUIET] * 10, hangover_ms=200)
+    assert out == [TONE] * 5 + [QUIET] * 10
+    assert suppressor.bytes_suppressed == 0
+
+
+def test_sustained_silence_is_held_back_and_counted():
+    out, suppressor = suppress([TONE] + [QUIET] * 100, hangover_ms=200, preroll_ms=100)
+    assert out[1:11] == [QUIET] * 10
+    assert out[11:] == [b""] * 90
+    # All but the 100 ms pre-roll of the 90 suppressed frames is saved
+    assert suppressor.bytes_suppressed == (90 - 5) * FRAME_BYTES
+
+
+def test_speech_onset_is_sent_with_its_preroll():
+    out, _ = suppress([TONE] + [QUIET] * 50 + [TONE], hangover_ms=200, preroll_ms=100)
+    assert out[-1] == QUIET * 5 + TONE
+
+
+def test_keepalive_due_once_per_interval_of_suppressed_audio():
+    suppressor = SilenceSuppressor(hangover_ms=0, preroll_ms=0, keepalive_ms=1000)
+    due = []
+    for _ in range(150):  # 3 seconds of silence
+        suppressor.push(QUIET)
+        due.append(suppressor.keepalive_due())
+    assert sum(due) == 3
+    assert suppressor.keepalives == 3
+
+
+def test_fixed_chunker_groups_frames_into_whole_chunks():
+    chunker = InboundChunker(chunk_ms=60)
+    pushed = [chunker.push(TONE) for _ in range(7)]
+    assert [len(chunks) for chunks in pushed] == [0, 0, 1, 0, 0, 1, 0]
+    assert all(len(chunk) == 3 * FRAME_BYTES for chunks in pushed for chunk in chunks)
+    assert chunker.flush() == [TONE]
+
+
+def test_adaptive_chunker_grows_chunks_during_silence_only():
+    chunker = InboundChunker(adaptive=True, silence_chunk_ms=200, hangover_ms=100)
+    speech = [chunker.push(TONE) for _ in range(3)]
+    assert [len(chunk) for chunks in speech for chunk in chunks] == [FRAME_BYTES] * 3
+
+    quiet = [chunk for _ in range(30) for chunk in chunker.push(QUIET)]
+    # Hangover frames go out one by one, then silence is sent 200 ms at a time
+    assert [len(chunk) for chunk in quiet[:5]] == [FRAME_BYTES] * 5
+    assert {len(chunk) for chunk in quiet[5:]} == {10 * FRAME_BYTES}
+
+    # Speech onset sends everything buffered at once
+    onset = chunker.push(TONE)
+    assert len(onset) == 1 and onset[0].endswith(TONE)
@@ -0,0 +1,32 @@
+import time
+
+import audio_tap
+
+
+def wait_for_writer():
+    deadline = time.monotonic() + 5
+    while audio_tap._budget["buffered_bytes"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_sessions_of_one_call_get_separate_readable_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(audio_tap, "AUDIO_TAP_DIR", str(tmp_path / "taps"))
+    big_message = b"\x10" * 100_000  # Longer than a 16-bit record length
+    taps = []
+    for _ in range(2):
+        tap = audio_tap.open_tap("CA1")
+        tap.write(audio_tap.TRACK_INBOUND, b"\xff" * 160)
+        tap.write(audio_tap.TRACK_OUTBOUND, big_message)
+        tap.close()
+        taps.append(tap)
+        time.sleep(0.002)
+    wait_for_writer()
+
+    assert taps[0].path != taps[1].path
+    for tap in taps:
+        header, frames = audio_tap.read_tap(tap.path)
+        assert header["call_sid"] == "CA1"
+        assert [(track, data) for track, _, data in frames] == [
+            (audio_tap.TRACK_INBOUND, b"\xff" * 160),
+            (audio_tap.TRACK_OUTBOUND, big_message)
+        ]
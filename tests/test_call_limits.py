@@ -0,0 +1,107 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+import main
+import pizza_functions
+
+
+class HoldSocket:
+    """Twilio socket stub: records what the server sends, replays queued caller events."""
+
+    def __init__(self):
+        self.sent = []
+        self.incoming = asyncio.Queue()
+
+    async def send(self, message):
+        self.sent.append(json.loads(message))
+
+    def hang_up(self):
+        self.incoming.put_nowait(json.dumps({"event": "stop"}))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.incoming.get()
+
+
+@pytest.fixture(autouse=True)
+def two_slots(monkeypatch):
+    monkeypatch.setattr(main, "MAX_CONCURRENT_CALLS", 2)
+    monkeypatch.setitem(main.call_duration_stats, "average_seconds", 180.0)
+    yield
+    main.ACTIVE_CALLS.clear()
+    main.WAITING_CALLS.clear()
+    main.CALL_ADMITTED_AT.clear()
+
+
+def waiting_sids():
+    return [call_sid for call_sid, _ in main.WAITING_CALLS]
+
+
+def test_waiting_callers_are_admitted_in_arrival_order():
+    async def run():
+        assert await main.wait_for_call_slot("CA1", HoldSocket(), "MZ1")
+        assert await main.wait_for_call_slot("CA2", HoldSocket(), "MZ2")
+        sockets = {call_sid: HoldSocket() for call_sid in ("CA3", "CA4")}
+        waiters = {call_sid: asyncio.create_task(main.wait_for_call_slot(call_sid, ws, "MZ"))
+                   for call_sid, ws in sockets.items()}
+        await asyncio.sleep(0)
+        assert waiting_sids() == ["CA3", "CA4"]
+        assert pizza_functions.CALL_QUEUE["customers_waiting"] == 2
+
+        main.release_call_slot("CA1")
+        assert await waiters["CA3"]
+        assert not waiters["CA4"].done()
+        assert main.ACTIVE_CALLS == {"CA2", "CA3"}
+        assert sockets["CA3"].sent[-1]["event"] == "clear"
+
+        main.release_call_slot("CA2")
+        assert await waiters["CA4"]
+        assert main.ACTIVE_CALLS == {"CA3", "CA4"}
+        assert pizza_functions.CALL_QUEUE["customers_waiting"] == 0
+
+    asyncio.run(run())
+
+
+def test_caller_who_hangs_up_on_hold_leaves_the_queue():
+    async def run():
+        for call_sid in ("CA1", "CA2"):
+            await main.wait_for_call_slot(call_sid, HoldSocket(), "MZ")
+        leaving, staying = HoldSocket(), HoldSocket()
+        left = asyncio.create_task(main.wait_for_call_slot("CA3", leaving, "MZ3"))
+        stayed = asyncio.create_task(main.wait_for_call_slot("CA4", staying, "MZ4"))
+        await asyncio.sleep(0)
+
+        leaving.hang_up()
+        assert await left is False
+        assert waiting_sids() == ["CA4"]
+        assert pizza_functions.CALL_QUEUE["customers_waiting"] == 1
+
+        # The freed slot goes to the caller still waiting, not the one who left
+        main.release_call_slot("CA1")
+        assert await stayed
+        assert main.ACTIVE_CALLS == {"CA2", "CA4"}
+        assert pizza_functions.CALL_QUEUE["customers_waiting"] == 0
+
+    asyncio.run(run())
+
+
+def test_wait_estimate_uses_the_time_active_calls_have_left():
+    now = time.monotonic()
+    main.ACTIVE_CALLS.update({"CA1", "CA2"})
+    main.CALL_ADMITTED_AT.update({"CA1": now - 160, "CA2": now - 20})
+
+    assert main.estimate_wait_seconds(0) == 0
+    assert main.estimate_wait_seconds(1) in (19, 20)  # CA1 is nearly done
+    assert main.estimate_wait_seconds(2) in (159, 160)  # Then CA2
+    assert main.estimate_wait_seconds(3) in (199, 200)  # CA1's slot, one average call later
+
+
+def test_free_slots_mean_no_wait(monkeypatch):
+    monkeypatch.setattr(main, "MAX_CONCURRENT_CALLS", 1)
+    assert main.estimate_wait_seconds(1) == 0
+    assert main.estimate_wait_seconds(2) == 180
@@ -0,0 +1,119 @@
+import asyncio
+import json
+import threading
+import time
+
+import main
+import pizza_functions
+
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, message):
+        self.sent.append(json.loads(message))
+
+
+def test_function_calls_run_off_the_event_loop(monkeypatch):
+    threads = []
+
+    def slow_lookup(order_id):
+        threads.append(threading.current_thread())
+        time.sleep(0.2)  # A slow archive scan
+        return {"error": "not found"}
+
+    monkeypatch.setitem(main.FUNCTION_MAP, "lookup_order", slow_lookup)
+    request = {"type": "FunctionCallRequest",
+               "functions": [{"name": "lookup_order", "id": "f1", "arguments": json.dumps({"order_id": 999})}]}
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.create_task(ticker())
+        socket = FakeSocket()
+        await main.handle_function_call_request(request, socket, "CAloop")
+        ticking.cancel()
+        return ticks, socket.sent
+
+    ticks, sent = asyncio.run(run())
+    assert threads and threads[0] is not threading.main_thread()
+    assert ticks >= 10  # The loop kept running during the lookup
+    assert sent[0]["id"] == "f1"
+
+
+def test_placed_order_starts_the_grace_period():
+    state = main.new_conversation_state()
+    arguments = {"customer_name": "Ann", "phone": "555-0199", "order_type": "pickup", "address": "",
+                 "items": [{"type": "drink", "name": "coke", "quantity": 1}]}
+    result = asyncio.run(main.execute_function_call("place_pizza_order", arguments, state))
+    assert "order_id" in result
+    assert state["order_placed"] and state["grace_period_start"]
+    pizza_functions.ORDERS_DB["orders"].pop(result["order_id"])
+
+
+def test_reorder_starts_the_grace_period():
+    first = pizza_functions.place_pizza_order("Ann", "555-0198", "pickup", "",
+                                              [{"type": "drink", "name": "coke", "quantity": 1}])
+    state = main.new_conversation_state()
+    result = asyncio.run(main.execute_function_call("reorder_last_order", {"phone": "555-0198"}, state))
+    try:
+        assert result["repeated_order_id"] == first["order_id"]
+        assert state["order_placed"] and state["grace_period_start"]
+    finally:
+        for order_id in (first["order_id"], result.get("order_id")):
+            pizza_functions.ORDERS_DB["orders"].pop(order_id, None)
+
+
+def test_resent_order_places_one_order_and_gets_the_same_response():
+    arguments = {"customer_name": "Cy", "phone": "555-0197", "order_type": "pickup", "address": "",
+                 "items": [{"type": "drink", "name": "water", "quantity": 1}]}
+    request = {"type": "FunctionCallRequest",
+               "functions": [{"name": "place_pizza_order", "id": "f7", "arguments": json.dumps(arguments)}]}
+    orders_before = set(pizza_functions.ORDERS_DB["orders"])
+
+    async def run():
+        socket = FakeSocket()
+        await main.handle_function_call_request(request, socket, "CAresend")
+        await main.handle_function_call_request(request, socket, "CAresend")
+        return socket.sent
+
+    sent = asyncio.run(run())
+    placed = set(pizza_functions.ORDERS_DB["orders"]) - orders_before
+    try:
+        assert len(placed) == 1
+        assert sent[0] == sent[1]
+    finally:
+        for order_id in placed:
+            pizza_functions.ORDERS_DB["orders"].pop(order_id)
+
+
+def test_read_only_cache_hit_answers_with_the_new_request_id(monkeypatch):
+    calls = []
+
+    def get_menu():
+        calls.append(1)
+        return {"pizzas": ["margherita"]}
+
+    monkeypatch.setitem(main.FUNCTION_MAP, "get_menu", get_menu)
+
+    def request(func_id):
+        return {"type": "FunctionCallRequest",
+                "functions": [{"name": "get_menu", "id": func_id, "arguments": "{}"}]}
+
+    async def run():
+        socket = FakeSocket()
+        await main.handle_function_call_request(request("m1"), socket, "CAmenu")
+        await main.handle_function_call_request(request("m2"), socket, "CAmenu")
+        return socket.sent
+
+    first, second = asyncio.run(run())
+    assert len(calls) == 1
+    assert (first["id"], second["id"]) == ("m1", "m2")
+    assert second["content"] == first["content"]
@@ -0,0 +1,30 @@
+import pizza_functions
+from pizza_functions import ORDERS_DB, TOPPING_KEYS, _process_order_item
+
+
+def test_repeated_toppings_round_trip_exactly():
+    item = _process_order_item({"type": "pizza", "name": "build_your_own", "size": "medium",
+                                "toppings": ["ham", "ham", "mushrooms"], "quantity": 1})["item"]
+    as_dict = item.to_dict(TOPPING_KEYS)
+    assert as_dict["toppings"] == ["ham", "ham", "mushrooms"]
+
+    request = pizza_functions._item_request(as_dict)
+    again = _process_order_item(request)["item"]
+    assert again.unit_cents == item.unit_cents
+    assert again.toppings == item.toppings
+
+
+def test_reorder_charges_the_same_total():
+    items = [
+        {"type": "pizza", "name": "build_your_own", "size": "large", "toppings": ["ham", "ham"], "quantity": 3},
+        {"type": "pizza", "name": "supreme", "size": "small", "toppings": ["pineapple"], "quantity": 1},
+        {"type": "drink", "name": "coke", "quantity": 2}
+    ]
+    first = pizza_functions.place_pizza_order("Ann", "(555) 010-2030", "pickup", "", items)
+    repeat = pizza_functions.reorder_last_order("555-010-2030")
+    try:
+        assert repeat["repeated_order_id"] == first["order_id"]
+        assert repeat["total_price"] == first["total_price"]
+    finally:
+        for order_id in (first["order_id"], repeat["order_id"]):
+            ORDERS_DB["orders"].pop(order_id, None)
@@ -0,0 +1,42 @@
+import asyncio
+import base64
+import json
+
+from audio import FRAME_BYTES, MULAW_SILENCE
+import main
+
+
+class FakeSocket:
+    def __init__(self):
+        self.payloads = []
+
+    async def send(self, message):
+        self.payloads.append(base64.b64decode(json.loads(message)["media"]["payload"]))
+
+
+async def play(pushes, end_of_speech):
+    ws = FakeSocket()
+    outbound = main.OutboundAudio(ws, "MZ1")
+    task = asyncio.create_task(outbound.run())
+    for audio in pushes:
+        outbound.push(audio)
+        await asyncio.sleep(0.05)
+    if end_of_speech:
+        outbound.end_of_speech()
+    await asyncio.sleep(0.1)
+    task.cancel()
+    return ws.payloads, outbound
+
+
+def test_mid_turn_audio_is_sent_in_whole_frames_only():
+    payloads, outbound = asyncio.run(play([b"\x10" * 1000], end_of_speech=False))
+    assert all(len(payload) % FRAME_BYTES == 0 for payload in payloads)
+    assert sum(map(len, payloads)) == 960
+    assert len(outbound.buffer) == 40
+
+
+def test_end_of_speech_pads_the_last_partial_frame():
+    payloads, _ = asyncio.run(play([b"\x10" * 1000], end_of_speech=True))
+    assert all(len(payload) % FRAME_BYTES == 0 for payload in payloads)
+    audio = b"".join(payloads)
+    assert audio == b"\x10" * 1000 + bytes([MULAW_SILENCE]) * 120
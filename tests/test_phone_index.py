@@ -0,0 +1,64 @@
+import datetime
+import json
+import os
+import subprocess
+import sys
+
+import order_archive
+import pizza_functions
+from order_records import normalize_phone
+
+
+def test_normalize_phone():
+    assert normalize_phone("+1 (555) 010-2030") == "5550102030"
+    assert normalize_phone("555.010.2030") == "5550102030"
+    assert normalize_phone("") == ""
+
+
+def test_limit_null_uses_the_default():
+    order = pizza_functions.place_pizza_order("Bo", "555-0177", "pickup", "",
+                                              [{"type": "drink", "name": "water", "quantity": 1}])
+    try:
+        result = pizza_functions.get_customer_orders("5550177", limit=None)
+        assert result["orders"][0]["order_id"] == order["order_id"]
+    finally:
+        pizza_functions.ORDERS_DB["orders"].pop(order["order_id"], None)
+
+
+def test_phone_lookup_does_not_reveal_the_address():
+    order = pizza_functions.place_pizza_order("Di", "555-0166", "delivery", "12 Elm Street",
+                                              [{"type": "drink", "name": "water", "quantity": 1}])
+    repeat = pizza_functions.reorder_last_order("555-0166")
+    try:
+        assert "Elm" not in json.dumps(pizza_functions.get_customer_orders("555-0166"))
+        assert "Elm" not in repeat["message"] and "address on file" in repeat["message"]
+        assert pizza_functions.lookup_order(repeat["order_id"])["address"] == "12 Elm Street"
+    finally:
+        for order_id in (order["order_id"], repeat.get("order_id")):
+            pizza_functions.ORDERS_DB["orders"].pop(order_id, None)
+
+
+def test_phone_history_survives_archiving_and_restart(tmp_path, monkeypatch):
+    monkeypatch.setattr(order_archive, "ORDER_ARCHIVE_DIR", str(tmp_path))
+    monkeypatch.setattr(order_archive, "_index", None)
+    monkeypatch.setattr(order_archive, "_phones", None)
+    order = {"id": 41, "customer_name": "Cy", "phone": "1-555-010-9999", "order_type": "pickup", "address": None,
+             "items": [], "total_price": 0, "timestamp": "2026-01-01T12:00:00", "kitchen_status": "completed"}
+    order_archive.archive_orders({datetime.date(2026, 1, 1): [order]})
+
+    # A fresh process reads the phone index from disk
+    monkeypatch.setattr(order_archive, "_phones", None)
+    assert order_archive.archived_ids_by_phone() == {"5550109999": [41]}
+
+    # An archive from before phones.json existed is backfilled from its segments
+    (tmp_path / "phones.json").unlink()
+    monkeypatch.setattr(order_archive, "_phones", None)
+    assert order_archive.archived_ids_by_phone() == {"5550109999": [41]}
+    assert (tmp_path / "phones.json").exists()
+
+    # A restarted server seeds PHONE_INDEX from it
+    restarted = subprocess.run(
+        [sys.executable, "-c", "import pizza_functions; print(pizza_functions.PHONE_INDEX)"],
+        env=dict(os.environ, ORDER_ARCHIVE_DIR=str(tmp_path)), capture_output=True, text=True, check=True
+    )
+    assert restarted.stdout.strip() == "{'5550109999': [41]}"
@@ -0,0 +1,38 @@
+import asyncio
+import base64
+import json
+
+import audio_tap
+import call_recorder
+import replay_call
+from call_recorder import CHANNEL_DEEPGRAM, CHANNEL_TWILIO, RECEIVED, SENT
+
+
+async def write_fixture():
+    recorder = call_recorder.CallRecorder()
+    recorder.call_sid = "CAtest"
+    recorder.record(CHANNEL_TWILIO, RECEIVED, json.dumps({"event": "connected"}))
+    recorder.record(CHANNEL_TWILIO, RECEIVED, json.dumps({"event": "start", "start": {"streamSid": "MZ1", "callSid": "CAtest"}}))
+    recorder.record(CHANNEL_DEEPGRAM, SENT, json.dumps({"type": "Settings"}))
+    payload = base64.b64encode(b"\xff" * 160).decode()
+    for _ in range(20):
+        recorder.record(CHANNEL_TWILIO, RECEIVED, json.dumps({"event": "media", "media": {"track": "inbound", "payload": payload}}))
+    recorder.record(CHANNEL_DEEPGRAM, RECEIVED, b"\x10" * 800)
+    recorder.record(CHANNEL_TWILIO, RECEIVED, json.dumps({"event": "stop"}))
+    await recorder.close()
+    return recorder.path
+
+
+def test_replay_leaves_the_recording_and_tap_dir_untouched(tmp_path, monkeypatch):
+    monkeypatch.setattr(call_recorder, "CALL_RECORDING_DIR", str(tmp_path))
+    monkeypatch.setattr(audio_tap, "AUDIO_TAP_DIR", str(tmp_path / "taps"))
+    path = asyncio.run(write_fixture())
+    with open(path, "rb") as f:
+        original = f.read()
+
+    asyncio.run(replay_call.replay(path, fast=True))
+
+    with open(path, "rb") as f:
+        assert f.read() == original
+    assert [entry.name for entry in tmp_path.iterdir()] == [path.rsplit("/", 1)[1]]
+    assert len(call_recorder.read_recording(path)) == 25
@@ -0,0 +1,79 @@
+import asyncio
+import contextlib
+import json
+
+import main
+
+
+class CallerSocket:
+    """Socket stub that plays the given events, then waits."""
+
+    def __init__(self, events):
+        self.incoming = asyncio.Queue()
+        for event in events:
+            self.incoming.put_nowait(json.dumps(event))
+        self.sent = []
+        self.closed = False
+
+    async def send(self, message):
+        self.sent.append(message)
+
+    async def close(self):
+        self.closed = True
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.incoming.get()
+
+
+def test_first_task_to_finish_ends_the_call(monkeypatch):
+    monkeypatch.setattr(main, "CALL_TEARDOWN_TIMEOUT_SECONDS", 0.05)
+    cancelled = []
+
+    async def hangs_up():
+        await asyncio.sleep(0.01)
+
+    async def listens():
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.append("listens")
+            raise
+
+    async def ignores_cancel():
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.append("ignores_cancel")
+        # Outlives the teardown timeout; asyncio.run cancels it again on the way out
+        await asyncio.sleep(1)
+
+    leaked_before = main.session_stats["leaked_tasks"]
+    asyncio.run(main.supervise_call("CAsupervise", [hangs_up(), listens(), ignores_cancel()]))
+
+    assert sorted(cancelled) == ["ignores_cancel", "listens"]
+    assert main.session_stats["leaked_tasks"] == leaked_before + 1
+    main.session_stats["leaked_tasks"] = leaked_before
+
+
+def test_hangup_tears_down_the_whole_call():
+    caller = CallerSocket([
+        {"event": "start", "start": {"streamSid": "MZteardown", "callSid": "CAteardown"}},
+        {"event": "stop"}
+    ])
+    agent = CallerSocket([])
+
+    @contextlib.asynccontextmanager
+    async def connect():
+        yield agent
+
+    ended_before = main.session_stats["ended"]
+    asyncio.run(main.twilio_handler(caller, connect=connect))
+
+    assert "CAteardown" not in main.CALL_SESSIONS
+    assert "CAteardown" not in main.ACTIVE_CALLS
+    assert main.session_stats["ended"] == ended_before + 1
+    assert json.loads(agent.sent[0])["type"] == "Settings"
+    assert caller.closed